@@ -6,17 +6,21 @@
 
 import argparse
 import collections
-import copy
-import filecmp
+import collections.abc
 import json
 import logging
+import operator
 import os
 import os.path
 import re
-from shutil import copyfile, copytree
 import sys
 import time
 
+__version__ = "1.2.18278"
+
+# Modules needed only by some subcommands (shutil, sqlite3, http.server, ...)
+# are imported inside the functions that use them, keeping start-up fast.
+
 # This is a dictionary of a list of lists.  Each inner list specifies
 # JSON keys whose values, together, must be unique.
 
@@ -55,6 +59,45 @@ list_element_unique_keys = {
     "SYS_OOM": [["OOM_TYPE", "OOM_LEVEL", "LENS_ID", "LIB_FEAT_ID", "FELEM_ID", "LIB_FELEM_ID"]]
 }
 
+# Foreign keys of g2config.json lists.  For each list, a dictionary of
+# JSON key to the list it refers to.  The JSON key must, alone, be a
+# unique key of the referred-to list in list_element_unique_keys.
+
+g2config_foreign_keys = {
+    "CFG_ATTR": {"FTYPE_CODE": "CFG_FTYPE", "FELEM_CODE": "CFG_FELEM"},
+    "CFG_CFBOM": {"CFCALL_ID": "CFG_CFCALL", "FTYPE_ID": "CFG_FTYPE", "FELEM_ID": "CFG_FELEM"},
+    "CFG_CFCALL": {"FTYPE_ID": "CFG_FTYPE", "CFUNC_ID": "CFG_CFUNC"},
+    "CFG_CFRTN": {"CFUNC_ID": "CFG_CFUNC"},
+    "CFG_DFBOM": {"DFCALL_ID": "CFG_DFCALL", "FTYPE_ID": "CFG_FTYPE", "FELEM_ID": "CFG_FELEM"},
+    "CFG_DFCALL": {"FTYPE_ID": "CFG_FTYPE", "DFUNC_ID": "CFG_DFUNC"},
+    "CFG_EBOM": {"ETYPE_ID": "CFG_ETYPE", "FTYPE_ID": "CFG_FTYPE"},
+    "CFG_EFBOM": {"EFCALL_ID": "CFG_EFCALL", "FTYPE_ID": "CFG_FTYPE", "FELEM_ID": "CFG_FELEM"},
+    "CFG_EFCALL": {"FTYPE_ID": "CFG_FTYPE", "EFUNC_ID": "CFG_EFUNC"},
+    "CFG_ERRULE": {"RTYPE_ID": "CFG_RTYPE"},
+    "CFG_ETYPE": {"ECLASS_ID": "CFG_ECLASS"},
+    "CFG_FBOM": {"FTYPE_ID": "CFG_FTYPE", "FELEM_ID": "CFG_FELEM"},
+    "CFG_FBOVR": {"FTYPE_ID": "CFG_FTYPE", "ECLASS_ID": "CFG_ECLASS"},
+    "CFG_FTYPE": {"FCLASS_ID": "CFG_FCLASS", "RTYPE_ID": "CFG_RTYPE"},
+    "CFG_GENERIC_THRESHOLD": {"GPLAN_ID": "CFG_GPLAN", "FTYPE_ID": "CFG_FTYPE"},
+    "CFG_RTYPE": {"RCLASS_ID": "CFG_RCLASS"},
+    "CFG_SFCALL": {"FTYPE_ID": "CFG_FTYPE", "SFUNC_ID": "CFG_SFUNC"},
+    "SYS_OOM": {"FTYPE_ID": "CFG_FTYPE", "LENS_ID": "CFG_LENS"},
+}
+
+# Foreign key values that refer to nothing, such as FTYPE_ID 0 meaning "all features".
+
+g2config_no_reference_values = [None, 0, ""]
+
+# A dictionary of a list of functions.  Each function extracts the
+# "compound unique key" of a list element.  Compiled from list_element_unique_keys.
+
+list_element_unique_key_extractors = {}  # To be populated by set_list_element_unique_keys().
+default_for_missing_value = "!no-key-value!"
+
+# Marks a JSON key that is not present.  Used by dictionary_delta().
+
+missing_value = object()
+
 # A list of files that should not be copied into the proposal.
 
 blacklist = []  # To be populated at run-time from the template.
@@ -82,6 +125,69 @@ blacklist_template = [
     "{0}/g2/python/UpgradeConfig.py"
     ]
 
+# Lists of [old, new, proposed] pathname templates for migrate-senzing-dir.
+#   {0} is the old directory, {1} the new directory, {2} the proposed directory.
+
+diff_directories_list = [
+    ["{0}/g2/python", "{1}/g2/python", "{2}/g2/python"]
+]
+
+diff_files_list = [
+    ["{0}/g2/setupEnv", "{1}/g2/setupEnv", "{2}/g2/setupEnv"],
+    ["{0}/g2/data/g2.lic", "{1}/g2/data/g2.lic", "{2}/g2/data/g2.lic"]
+]
+
+diff_sqlite_files_list = [
+    ["{0}/g2/sqldb/G2C.db", "{0}/g2/data/G2C.db", "{2}/g2/sqldb/G2C.db"]
+]
+
+# Names not compared by scan_directory_diff().  The same as filecmp.DEFAULT_IGNORES.
+
+directory_diff_ignores = frozenset(["RCS", "CVS", "tags", ".git", ".hg", ".bzr", "_darcs", "__pycache__"])
+
+# Directories known to exist.  Maintained by ensure_directory().
+
+ensured_directories = set()
+
+# A list of files that are compared by size and modification time only.
+
+immutable_files = []  # To be populated at run-time from --immutable-file.
+
+# SHA-256 digests of files written to the proposal, computed while copying.
+# Map of normalized proposed filename to (digest, size, mtime_ns).
+
+proposed_file_digests = {}
+
+# Size, in bytes, of blocks read when copying and hashing files.
+
+file_copy_block_size = 1024 * 1024
+
+# Sizes, in bytes, used when comparing files.
+
+file_compare_sample_size = 64 * 1024
+file_compare_stride_size = 16 * 1024 * 1024
+
+# Cache of migrate-g2config results.
+
+cache_directory_default = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "senzing-migrate")
+cache_max_bytes_default = 256 * 1024 * 1024
+
+# Default manifest of a proposal.  {0} is the proposed directory.
+
+manifest_filename_default = "{0}-manifest.json"
+
+# Name of the index member of a proposal archive.
+
+proposal_index_member = "senzing-proposal-index.json"
+
+# Compressed files read and written by open_compressed(): name, file extension, magic bytes.
+
+compressed_file_types = [
+    ("gzip", ".gz", b"\x1f\x8b"),
+    ("xz", ".xz", b"\xfd7zXZ\x00"),
+    ("zstd", ".zst", b"\x28\xb5\x2f\xfd"),
+]
+
 # Log messages.
 
 log_file_diff_template = "changed: {0} {1}"
@@ -93,46 +199,109 @@ exit_template = "migrate.py {0} output: {1}"
 # -----------------------------------------------------------------------------
 
 
-def get_parser():
-    '''Parse commandline arguments.'''
+def get_parser(subcommand=None):
+    '''Parse commandline arguments.  If subcommand is given, only its subparser is built.'''
     parser = argparse.ArgumentParser(prog="migrate.py", description="Migrate Senzing configuration")
     subparsers = parser.add_subparsers(dest='subcommand', help='Subcommands:')
 
-    subparser_1 = subparsers.add_parser('add-dscr-etype', help='Add existing G2_CONFIG.CFG_DSCR and G2_CONFIG.CFG_ETYPE to a new g2config.json template')
-    subparser_1.add_argument("--existing-g2config-file", dest="existing_filename", required=True, help="Input file pathname for existing g2config.json configuration file")
-    subparser_1.add_argument("--template-g2config-file", dest="template_filename", required=True, help="Input file pathname for the g2config.json configuration template")
-    subparser_1.add_argument("--output-file", dest="output_filename", help="Output file pathname")
-
-    subparser_2 = subparsers.add_parser('json-add-keys', help='Add missing JSON keys to a JSON file from a JSON template file')
-    subparser_2.add_argument("--existing-file", dest="existing_filename", required=True, help="Input file pathname for existing JSON file")
-    subparser_2.add_argument("--template-file", dest="template_filename", required=True, help="Input file pathname for template JSON file")
-    subparser_2.add_argument("--output-file", dest="output_filename", help="Output file pathname")
-
-    subparser_3 = subparsers.add_parser('json-add-list-elements', help='Add elements to existing lists')
-    subparser_3.add_argument("--existing-file", dest="existing_filename", required=True, help="Input file pathname for existing JSON file")
-    subparser_3.add_argument("--template-file", dest="template_filename", required=True, help="Input file pathname for template JSON file")
-    subparser_3.add_argument("--output-file", dest="output_filename", help="Output file pathname")
-
-    subparser_4 = subparsers.add_parser('json-pretty-print', help='Sort and pretty print a file of JSON')
-    subparser_4.add_argument("--input-file", dest="input_filename", required=True, help="Input file pathname")
-    subparser_4.add_argument("--output-file", dest="output_filename", help="Output file pathname")
-
-    subparser_5 = subparsers.add_parser('migrate-g2config', help='Migrate g2config.json')
-    subparser_5.add_argument("--existing-g2config-file", dest="existing_filename", required=True, help="Input file pathname for existing g2config.json configuration file")
-    subparser_5.add_argument("--template-g2config-file", dest="template_filename", required=True, help="Input file pathname for the g2config.json configuration template")
-    subparser_5.add_argument("--g2config-blacklist", dest="g2config_blacklist_filename", help="File of values that are not migrated in g2config.json")
-    subparser_5.add_argument("--output-file", dest="output_filename", help="Output file pathname")
-
-    subparser_6 = subparsers.add_parser('migrate-senzing-dir', help='Migrate /opt/senzing directory by creating a proposal')
-    subparser_6.add_argument("--old-senzing-dir", dest="old_senzing_directory", required=True, help="Path to existing /opt/senzing")
-    subparser_6.add_argument("--new-senzing-dir", dest="new_senzing_directory", required=True, help="Path to newly created /opt/new-senzing")
-    subparser_6.add_argument("--g2config-blacklist", dest="g2config_blacklist_filename", help="File of values that are not migrated in g2config.json")
-    subparser_6.add_argument("--proposed-senzing-dir", dest="proposed_senzing_directory", help="Path to proposed /opt/proposed-senzing")
-
-    subparser_7 = subparsers.add_parser('json-difference', help='Subtract two json files. minuend - subtrahend = difference')
-    subparser_7.add_argument("--minuend", dest="minuend_filename", required=True, help="Input file pathname")
-    subparser_7.add_argument("--subtrahend", dest="subtrahend_filename", required=True, help="Input file pathname")
-    subparser_7.add_argument("--output-file", dest="output_filename", help="Output file pathname")
+    if subcommand in (None, 'add-dscr-etype'):
+        subparser_1 = subparsers.add_parser('add-dscr-etype', help='Add existing G2_CONFIG.CFG_DSCR and G2_CONFIG.CFG_ETYPE to a new g2config.json template')
+        subparser_1.add_argument("--existing-g2config-file", dest="existing_filename", required=True, help="Input file pathname for existing g2config.json configuration file")
+        subparser_1.add_argument("--template-g2config-file", dest="template_filename", required=True, help="Input file pathname for the g2config.json configuration template")
+        subparser_1.add_argument("--output-file", dest="output_filename", help="Output file pathname")
+
+    if subcommand in (None, 'json-add-keys'):
+        subparser_2 = subparsers.add_parser('json-add-keys', help='Add missing JSON keys to a JSON file from a JSON template file')
+        subparser_2.add_argument("--existing-file", dest="existing_filename", required=True, help="Input file pathname, directory, or glob for existing JSON files")
+        subparser_2.add_argument("--template-file", dest="template_filename", required=True, help="Input file pathname for template JSON file")
+        subparser_2.add_argument("--output-file", dest="output_filename", help="Output file pathname")
+        subparser_2.add_argument("--output-dir", dest="output_directory", help="Output directory pathname when --existing-file is a directory or glob")
+        subparser_2.add_argument("--workers", dest="workers", type=int, help="Number of worker processes when --existing-file is a directory or glob. Default: number of CPUs")
+
+    if subcommand in (None, 'json-add-list-elements'):
+        subparser_3 = subparsers.add_parser('json-add-list-elements', help='Add elements to existing lists')
+        subparser_3.add_argument("--existing-file", dest="existing_filename", required=True, help="Input file pathname, directory, or glob for existing JSON files")
+        subparser_3.add_argument("--template-file", dest="template_filename", required=True, help="Input file pathname for template JSON file")
+        subparser_3.add_argument("--output-file", dest="output_filename", help="Output file pathname")
+        subparser_3.add_argument("--output-dir", dest="output_directory", help="Output directory pathname when --existing-file is a directory or glob")
+        subparser_3.add_argument("--workers", dest="workers", type=int, help="Number of worker processes when --existing-file is a directory or glob. Default: number of CPUs")
+
+    if subcommand in (None, 'json-pretty-print'):
+        subparser_4 = subparsers.add_parser('json-pretty-print', help='Sort and pretty print a file of JSON')
+        subparser_4.add_argument("--input-file", dest="input_filename", required=True, help="Input file pathname, directory, or glob")
+        subparser_4.add_argument("--output-file", dest="output_filename", help="Output file pathname")
+        subparser_4.add_argument("--output-dir", dest="output_directory", help="Output directory pathname when --input-file is a directory or glob")
+        subparser_4.add_argument("--workers", dest="workers", type=int, help="Number of worker processes when --input-file is a directory or glob. Default: number of CPUs")
+
+    if subcommand in (None, 'migrate-g2config'):
+        subparser_5 = subparsers.add_parser('migrate-g2config', help='Migrate g2config.json')
+        subparser_5.add_argument("--existing-g2config-file", dest="existing_filename", required=True, help="Input file pathname for existing g2config.json configuration file")
+        subparser_5.add_argument("--template-g2config-file", dest="template_filename", required=True, help="Input file pathname for the g2config.json configuration template")
+        subparser_5.add_argument("--g2config-blacklist", dest="g2config_blacklist_filename", help="File of values that are not migrated in g2config.json")
+        subparser_5.add_argument("--base-g2config-file", dest="base_filename", help="Input file pathname for the g2config.json template the existing file was made from. Enables a three-way merge")
+        subparser_5.add_argument("--conflicts-file", dest="conflicts_filename", help="Output file pathname for three-way merge conflicts")
+        subparser_5.add_argument("--progress", dest="progress", choices=["off", "tty", "json"], default="off", help="Report progress as a single updating line (tty) or as JSON lines on standard output (json). Default: off")
+        subparser_5.add_argument("--progress-interval", dest="progress_interval", type=float, default=1.0, help="Seconds between progress reports. Default: 1.0")
+        subparser_5.add_argument("--g2config-unique-keys", dest="g2config_unique_keys_filename", help="JSON or YAML file of unique keys for g2config.json lists")
+        subparser_5.add_argument("--output-file", dest="output_filename", help="Output file pathname")
+        subparser_5.add_argument("--cache-dir", dest="cache_directory", default=cache_directory_default, help="Directory of cached results. Default: {0}".format(cache_directory_default))
+        subparser_5.add_argument("--cache-max-bytes", dest="cache_max_bytes", type=int, default=cache_max_bytes_default, help="Maximum size of the cache. Default: {0}".format(cache_max_bytes_default))
+        subparser_5.add_argument("--validate", dest="validate", action="store_true", help="Check the output for references to list elements that do not exist, as validate-g2config does")
+        subparser_5.add_argument("--no-cache", dest="no_cache", action="store_true", help="Do not read or write cached results")
+
+    if subcommand in (None, 'migrate-senzing-dir'):
+        subparser_6 = subparsers.add_parser('migrate-senzing-dir', help='Migrate /opt/senzing directory by creating a proposal')
+        subparser_6.add_argument("--old-senzing-dir", dest="old_senzing_directory", help="Path to existing /opt/senzing. Required unless --apply-plan")
+        subparser_6.add_argument("--new-senzing-dir", dest="new_senzing_directory", help="Path to newly created /opt/new-senzing. Required unless --apply-plan")
+        subparser_6.add_argument("--g2config-blacklist", dest="g2config_blacklist_filename", help="File of values that are not migrated in g2config.json")
+        subparser_6.add_argument("--progress", dest="progress", choices=["off", "tty", "json"], default="off", help="Report progress as a single updating line (tty) or as JSON lines on standard output (json). Default: off")
+        subparser_6.add_argument("--progress-interval", dest="progress_interval", type=float, default=1.0, help="Seconds between progress reports. Default: 1.0")
+        subparser_6.add_argument("--g2config-unique-keys", dest="g2config_unique_keys_filename", help="JSON or YAML file of unique keys for g2config.json lists")
+        subparser_6.add_argument("--proposed-senzing-dir", dest="proposed_senzing_directory", help="Path to proposed /opt/proposed-senzing")
+        subparser_6.add_argument("--sqlite-table-diff", dest="sqlite_table_diff", action="store_true", help="Log table-level differences of SQLite databases")
+        subparser_6.add_argument("--engine", dest="engine", choices=["serial", "async"], default="serial", help="serial: one step at a time. async: overlap directory listing, comparison, and copying. Default: serial")
+        subparser_6.add_argument("--concurrency", dest="concurrency", type=int, default=16, help="Files compared or copied at once by --engine async. Default: 16")
+        subparser_6.add_argument("--plan", dest="plan_filename", help="Write a plan of the proposal to this file, using only file metadata, instead of creating the proposal")
+        subparser_6.add_argument("--apply-plan", dest="apply_plan_filename", help="Create the proposal from a plan written by --plan")
+        subparser_6.add_argument("--throughput", dest="throughput", type=float, help="Bytes per second used to estimate the duration of a --plan. Default: measured")
+        subparser_6.add_argument("--proposal-format", dest="proposal_format", choices=["dir", "tar", "tar.zst"], default="dir", help="dir: a directory tree. tar, tar.zst: one archive, applied with apply-proposal. Default: dir")
+        subparser_6.add_argument("--proposal-file", dest="proposal_filename", help="Output file pathname for a --proposal-format tar or tar.zst archive. Default: <proposed-senzing-dir>.<format>")
+        subparser_6.add_argument("--manifest-file", dest="manifest_filename", help="Output file pathname for the SHA-256 manifest of the proposal. Default: <proposed-senzing-dir>-manifest.json")
+        subparser_6.add_argument("--immutable-file", dest="immutable_files", action="append", default=[], help="File, relative to --old-senzing-dir, compared by size and modification time only. Repeatable.")
+
+    if subcommand in (None, 'json-difference'):
+        subparser_7 = subparsers.add_parser('json-difference', help='Subtract two json files. minuend - subtrahend = difference')
+        subparser_7.add_argument("--minuend", dest="minuend_filename", required=True, help="Input file pathname, directory, or glob")
+        subparser_7.add_argument("--subtrahend", dest="subtrahend_filename", required=True, help="Input file pathname")
+        subparser_7.add_argument("--output-file", dest="output_filename", help="Output file pathname")
+        subparser_7.add_argument("--output-dir", dest="output_directory", help="Output directory pathname when --minuend is a directory or glob")
+        subparser_7.add_argument("--out-of-core", dest="out_of_core", action="store_true", help="Stream --minuend through a temporary on-disk index of --subtrahend, for files larger than memory. Single --minuend file only")
+        subparser_7.add_argument("--temporary-dir", dest="temporary_directory", help="Directory for the --out-of-core index. Default: system temporary directory")
+        subparser_7.add_argument("--workers", dest="workers", type=int, help="Number of worker processes when --minuend is a directory or glob. Default: number of CPUs")
+
+    if subcommand in (None, 'serve'):
+        subparser_8 = subparsers.add_parser('serve', help='Serve transform_* and dictionary_difference operations over HTTP')
+        subparser_8.add_argument("--host", dest="host", default="127.0.0.1", help="Address to listen on. Default: 127.0.0.1")
+        subparser_8.add_argument("--port", dest="port", type=int, default=8250, help="Port to listen on. Default: 8250")
+        subparser_8.add_argument("--unix-socket", dest="unix_socket", help="Path of a Unix domain socket to listen on instead of --host and --port")
+        subparser_8.add_argument("--g2config-unique-keys", dest="g2config_unique_keys_filename", help="JSON or YAML file of unique keys for g2config.json lists")
+
+    if subcommand in (None, 'verify-proposal'):
+        subparser_9 = subparsers.add_parser('verify-proposal', help='Check a proposal against its SHA-256 manifest')
+        subparser_9.add_argument("--proposed-senzing-dir", dest="proposed_senzing_directory", required=True, help="Path to proposed /opt/proposed-senzing")
+        subparser_9.add_argument("--manifest-file", dest="manifest_filename", help="Input file pathname for the manifest. Default: <proposed-senzing-dir>-manifest.json")
+        subparser_9.add_argument("--workers", dest="workers", type=int, help="Number of files hashed at once. Default: based on number of CPUs")
+
+    if subcommand in (None, 'apply-proposal'):
+        subparser_10 = subparsers.add_parser('apply-proposal', help='Extract a proposal archive into the new Senzing directory')
+        subparser_10.add_argument("--proposal-file", dest="proposal_filename", required=True, help="Input file pathname of a proposal archive from migrate-senzing-dir --proposal-format tar or tar.zst")
+        subparser_10.add_argument("--new-senzing-dir", dest="new_senzing_directory", required=True, help="Path to the directory the proposal is applied to")
+
+    if subcommand in (None, 'validate-g2config'):
+        subparser_11 = subparsers.add_parser('validate-g2config', help='Check g2config.json for references to list elements that do not exist')
+        subparser_11.add_argument("--input-file", dest="input_filename", required=True, help="Input file pathname for g2config.json")
+        subparser_11.add_argument("--g2config-unique-keys", dest="g2config_unique_keys_filename", help="JSON or YAML file of unique keys for g2config.json lists")
+        subparser_11.add_argument("--output-file", dest="output_filename", help="Output file pathname for a JSON list of dangling references")
 
     return parser
 
@@ -141,8 +310,154 @@ def get_parser():
 # -----------------------------------------------------------------------------
 
 
+class Progress(object):
+    '''Counts work done by the compare, copy, and merge loops and reports it,
+       at most once per "interval" seconds, as a single updating line on a
+       terminal ("tty") or as one JSON object per line on standard output ("json").
+       Totals, when known, give an estimated time remaining.  Copies and merges
+       are estimated separately, each from its own rate since it started.'''
+
+    def __init__(self):
+        import threading
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self, mode="off", interval=1.0):
+        '''Reset counters and choose how progress is reported.'''
+        self.mode = mode
+        self.interval = interval
+        self.start_time = time.monotonic()
+        self.next_report_time = self.start_time + interval
+        self.files_compared = 0
+        self.files_copied = 0
+        self.files_total = 0
+        self.bytes_copied = 0
+        self.bytes_total = 0
+        self.rows_done = 0
+        self.rows_total = 0
+        self.rows_merged = {}
+        self.copy_start_time = None
+        self.merge_start_time = None
+
+    def add_totals(self, files=0, byte_count=0, rows=0):
+        '''Add to the amount of work expected.  Callers add totals before the work starts.'''
+        with self.lock:
+            self.files_total += files
+            self.bytes_total += byte_count
+            self.rows_total += rows
+
+    def compared(self, files=1):
+        '''Count files compared.'''
+        with self.lock:
+            self.files_compared += files
+        self.report()
+
+    def copied(self, files=1, byte_count=0):
+        '''Count files copied.'''
+        with self.lock:
+            if self.copy_start_time is None:
+                self.copy_start_time = time.monotonic()
+            self.files_copied += files
+            self.bytes_copied += byte_count
+        self.report()
+
+    def merged(self, table, rows_done, rows_merged):
+        '''Count rows examined, and rows added, in a merge of "table".'''
+        with self.lock:
+            if self.merge_start_time is None:
+                self.merge_start_time = time.monotonic()
+            self.rows_done += rows_done
+            self.rows_merged[table] = self.rows_merged.get(table, 0) + rows_merged
+        self.report()
+
+    def status(self):
+        '''Return a dictionary of the current progress, rates, and estimated seconds remaining.'''
+        now = time.monotonic()
+        elapsed_time = max(now - self.start_time, 1e-6)
+        result = {
+            "elapsed_seconds": round(elapsed_time, 3),
+            "files_compared": self.files_compared,
+            "files_copied": self.files_copied,
+            "files_total": self.files_total,
+            "bytes_copied": self.bytes_copied,
+            "bytes_total": self.bytes_total,
+            "rows_done": self.rows_done,
+            "rows_total": self.rows_total,
+            "rows_merged": dict(self.rows_merged),
+            "bytes_per_second": round(self.bytes_copied / elapsed_time, 1),
+            "files_per_second": round(self.files_copied / elapsed_time, 1),
+            "rows_per_second": round(self.rows_done / elapsed_time, 1),
+            "eta_seconds": None,
+        }
+
+        # Estimate the copies from bytes, or from files if no bytes are expected,
+        # and the merge from rows.  Each estimate uses the rate since that work started.
+
+        if self.bytes_total:
+            copy_work = (self.bytes_copied, self.bytes_total, self.copy_start_time)
+        else:
+            copy_work = (self.files_copied, self.files_total, self.copy_start_time)
+        merge_work = (self.rows_done, self.rows_total, self.merge_start_time)
+        estimates = [max(now - started, 1e-6) * max(total - done, 0) / done for done, total, started in [copy_work, merge_work] if total and done]
+        if estimates:
+            result["eta_seconds"] = round(sum(estimates), 1)
+        return result
+
+    def report(self, force=False):
+        '''Report progress if "interval" seconds have passed, or if force.'''
+        if self.mode == "off":
+            return
+        now = time.monotonic()
+        if not force and now < self.next_report_time:
+            return
+        self.next_report_time = now + self.interval
+        status = self.status()
+        if self.mode == "json":
+            sys.stdout.write(json.dumps(status, sort_keys=True) + "\n")
+            sys.stdout.flush()
+        else:
+            eta = "-" if status["eta_seconds"] is None else "{0:.0f}s".format(status["eta_seconds"])
+            line = "compared {0} | copied {1}/{2} files, {3}/{4} bytes, {5:.0f} B/s | merged {6}/{7} rows | ETA {8}".format(
+                status["files_compared"], status["files_copied"], status["files_total"], status["bytes_copied"], status["bytes_total"],
+                status["bytes_per_second"], status["rows_done"], status["rows_total"], eta)
+            sys.stderr.write("\r" + line.ljust(120))
+            sys.stderr.flush()
+
+    def finish(self):
+        '''Report final progress.'''
+        self.report(force=True)
+        if self.mode == "tty":
+            sys.stderr.write("\n")
+
+
+# Progress of the current subcommand.  Configured by --progress.
+
+progress = Progress()
+
+
+class PathMapping(collections.namedtuple("PathMapping", ["old", "new", "proposed"])):
+    '''Corresponding paths in the old, new, and proposed directories.'''
+    __slots__ = ()
+
+    def join(self, *names):
+        '''Return the PathMapping of a relative path below this one.'''
+        return PathMapping(*(None if path is None else os.path.join(path, *names) for path in self))
+
+
+DirectoryDiff = collections.namedtuple("DirectoryDiff", ["left", "right", "left_only", "right_only", "diff_files", "subdirs", "left_entries", "right_entries"])
+
+
+def ensure_directory(directory):
+    '''Create directory, and its parents, if needed.  Directories already
+       ensured are remembered so they are not checked again.'''
+    if directory and directory not in ensured_directories:
+        os.makedirs(directory, exist_ok=True)
+        ensured_directories.add(directory)
+
+
 def copy_directory(old, new):
     '''Copy a complete directory.'''
+    from shutil import copytree
     if os.path.exists(old):
         logging.info("copy-tree: {0} {1}".format(old, new))
         copytree(old, new)
@@ -150,8 +465,9 @@ def copy_directory(old, new):
         logging.error("Directory {0} does not exist".format(old))
 
 
-def copy_file(old_file, new_file):
-    '''Copy a file.  Create sub-directories if needed.'''
+def copy_file(old_file, new_file, exists=False):
+    '''Copy a file.  Create sub-directories if needed.
+       If exists, old_file is already known to exist and is not checked.'''
 
     # If blacklisted, do not copy.
 
@@ -160,71 +476,627 @@ def copy_file(old_file, new_file):
 
     # If file exists, perform copy.
 
-    if os.path.exists(old_file):
+    if exists or os.path.exists(old_file):
+
+        # Copy file into the proposal archive, if one is being written.
+
+        logging.info("copy-file: {0} {1}".format(old_file, new_file))
+        if proposal_archive.is_open():
+            proposal_archive.add_file(old_file, new_file)
+            progress.copied(byte_count=os.path.getsize(old_file))
+            return
 
         # Ensure directory exists for proposed file.
 
-        new_file_directory = os.path.dirname(new_file)
-        if not os.path.exists(new_file_directory):
-            os.makedirs(new_file_directory)
+        ensure_directory(os.path.dirname(new_file))
 
         # Copy file.
 
-        logging.info("copy-file: {0} {1}".format(old_file, new_file))
-        copyfile(old_file, new_file)
+        copy_file_with_digest(old_file, new_file)
+        progress.copied(byte_count=os.path.getsize(new_file))
     else:
         logging.error("File {0} does not exist".format(old_file))
 
 
-def handle_directory_diff(directory_diff, old_directory, new_directory, proposed_directory):
-    '''Recursively descend into subdirectories to copy files from the old_directory
-       into the proposed_directory if any of these conditions exist:
-       1) The file only exists in the old_directory
-       2) The file in the old_directory has been modified'''
+def record_proposed_file(filename, digest, size):
+    '''Remember the digest of a file written to the proposal, for write_proposal_manifest().'''
+    proposed_file_digests[os.path.normpath(filename)] = (digest, size, os.stat(filename).st_mtime_ns)
+
+
+def copy_file_with_digest(old_file, new_file):
+    '''Copy a file, computing its SHA-256 digest from the same reads.
+       Returns the hex digest.'''
+    import hashlib
+    digest = hashlib.sha256()
+    size = 0
+    with open(old_file, "rb") as input_file, open(new_file, "wb") as output_file:
+        for block in iter(lambda: input_file.read(file_copy_block_size), b""):
+            digest.update(block)
+            output_file.write(block)
+            size += len(block)
+    record_proposed_file(new_file, digest.hexdigest(), size)
+    return digest.hexdigest()
+
+
+class DigestReader(object):
+    '''Wrap a binary file, computing the SHA-256 digest of what is read from it.'''
+
+    def __init__(self, input_file):
+        import hashlib
+        self.input_file = input_file
+        self.digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        block = self.input_file.read(size)
+        self.digest.update(block)
+        return block
+
+
+class ProposalArchive(object):
+    '''Write a proposal as one tar archive, in one sequential stream, instead
+       of a directory tree.  Files are added where copy_file() would have
+       written them, relative to the proposed directory, and hashed as they
+       are read.  close() adds an index member with the SHA-256 digest and
+       size of every file, in the format of write_proposal_manifest().
+       A member name may be added only once.'''
+
+    def __init__(self):
+        import threading
+        self.lock = threading.Lock()
+        self.tar = None
+
+    def open(self, proposed_directory, archive_filename, archive_format):
+        '''Start writing archive_filename, a "tar" or "tar.zst" archive.'''
+        import tarfile
+        self.proposed_directory = proposed_directory
+        self.archive_filename = archive_filename
+        if archive_format == "tar.zst":
+            self.output_file = import_zstd().open(archive_filename, "wb")
+        else:
+            self.output_file = open(archive_filename, "wb")
+        self.tar = tarfile.open(fileobj=self.output_file, mode="w|")
+        self.files = {}
+
+    def is_open(self):
+        return self.tar is not None
+
+    def member_name(self, filename):
+        '''Return the archive member name of a file in the proposed directory.'''
+        return os.path.relpath(filename, self.proposed_directory).replace(os.sep, "/")
+
+    def check_new_member(self, name):
+        '''Raise ValueError if name is already in the archive.  Tools extracting
+           the archive could otherwise use either member.'''
+        if name in self.files:
+            raise ValueError("{0} is already in {1}".format(name, self.archive_filename))
+
+    def add_file(self, filename, proposed_filename):
+        '''Add the contents of filename as proposed_filename.'''
+        name = self.member_name(proposed_filename)
+        with open(filename, "rb") as input_file:
+            tar_info = self.tar.gettarinfo(arcname=name, fileobj=input_file)
+            reader = DigestReader(input_file)
+            with self.lock:
+                self.check_new_member(name)
+                self.tar.addfile(tar_info, reader)
+                self.files[name] = {
+                    "sha256": reader.digest.hexdigest(),
+                    "bytes": tar_info.size,
+                }
+
+    def add_bytes(self, data, proposed_filename):
+        '''Add data as proposed_filename.'''
+        import hashlib
+        import io
+        import tarfile
+        name = self.member_name(proposed_filename)
+        tar_info = tarfile.TarInfo(name)
+        tar_info.size = len(data)
+        tar_info.mtime = int(time.time())
+        tar_info.mode = 0o644
+        with self.lock:
+            self.check_new_member(name)
+            self.tar.addfile(tar_info, io.BytesIO(data))
+            self.files[name] = {
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "bytes": len(data),
+            }
+
+    def close(self):
+        '''Add the index member and finish the archive.'''
+        index = {
+            "version": __version__,
+            "proposed_senzing_directory": self.proposed_directory,
+            "files": self.files,
+        }
+        self.add_bytes(json.dumps(index, sort_keys=True, indent=4).encode("utf-8"), os.path.join(self.proposed_directory, proposal_index_member))
+        del self.files[proposal_index_member]
+        self.tar.close()
+        self.output_file.close()
+        self.tar = None
+        logging.info("make-file: {0}".format(self.archive_filename))
+
+
+# The proposal archive being written.  Opened by --proposal-format tar or tar.zst.
+
+proposal_archive = ProposalArchive()
+
+
+def copy_sqlite_database(old_file, new_file):
+    '''Copy a SQLite database using the SQLite backup API.  Create sub-directories if needed.
+       Files that are not SQLite databases are copied byte-for-byte.'''
+    import sqlite3
 
-    # Copy old file into the proposed directory.
+    # If blacklisted, do not copy.
 
-    merged_lists = directory_diff.diff_files + directory_diff.left_only
-    for name in merged_lists:
-        old_file = "{0}/{1}".format(directory_diff.left, name)
-        new_path = re.sub(new_directory, '', directory_diff.right)
-        new_file = "{0}{1}/{2}".format(proposed_directory, new_path, name)
-        copy_file(old_file, new_file)
+    if old_file in blacklist:
+        return
 
-    # Recurse into next level of subdirectories.
+    if not os.path.exists(old_file):
+        logging.error("File {0} does not exist".format(old_file))
+        return
 
-    for sub_directory_diff in directory_diff.subdirs.values():
-        handle_directory_diff(sub_directory_diff, old_directory, new_directory, proposed_directory)
+    # Ensure directory exists for proposed file.
+    # For a proposal archive, the backup is made in a temporary file and then added.
+
+    backup_file = new_file
+    if proposal_archive.is_open():
+        import tempfile
+        descriptor, backup_file = tempfile.mkstemp(suffix=".db")
+        os.close(descriptor)
+    else:
+        ensure_directory(os.path.dirname(new_file))
+
+    # Copy database.
+
+    logging.info("copy-sqlite: {0} {1}".format(old_file, new_file))
+    try:
+        try:
+            with open_sqlite_database(old_file) as old_connection:
+                new_connection = sqlite3.connect(backup_file)
+                try:
+                    old_connection.backup(new_connection)
+                finally:
+                    new_connection.close()
+        except sqlite3.DatabaseError as err:
+            logging.warning("{0} is not a SQLite database ({1}). Copying file.".format(old_file, err))
+            copy_file_with_digest(old_file, backup_file)
+        if backup_file != new_file:
+            proposal_archive.add_file(backup_file, new_file)
+    finally:
+
+        # Never leave the temporary backup behind.
+
+        if backup_file != new_file and os.path.exists(backup_file):
+            os.remove(backup_file)
+    progress.copied(byte_count=os.path.getsize(old_file))
+
+
+def open_sqlite_database(filename):
+    '''Open a SQLite database read-only.  The returned connection closes when used as a context manager.'''
+    import contextlib
+    import sqlite3
+    import urllib.parse
+    uri = "file:{0}?mode=ro".format(urllib.parse.quote(os.path.abspath(filename)))
+    return contextlib.closing(sqlite3.connect(uri, uri=True))
+
+
+def sqlite_database_summary(filename):
+    '''Return a dictionary of table name to (schema, row count) for a SQLite database.'''
+    result = {}
+    with open_sqlite_database(filename) as connection:
+        tables = connection.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table' ORDER BY name").fetchall()
+        for name, sql in tables:
+            row_count = connection.execute('SELECT COUNT(*) FROM "{0}"'.format(name.replace('"', '""'))).fetchone()[0]
+            result[name] = (sql, row_count)
+    return result
+
+
+def sqlite_database_difference(old_filename, new_filename):
+    '''Compare two SQLite databases table-by-table.  Returns a dictionary with
+       tables only in old, tables only in new, tables with changed schemas,
+       and tables with changed row counts.'''
+    old_summary = sqlite_database_summary(old_filename)
+    new_summary = sqlite_database_summary(new_filename)
+    result = {
+        "old-only": sorted(old_summary.keys() - new_summary.keys()),
+        "new-only": sorted(new_summary.keys() - old_summary.keys()),
+        "schema-changed": [],
+        "row-count-changed": {},
+    }
+    for table in sorted(old_summary.keys() & new_summary.keys()):
+        old_sql, old_row_count = old_summary[table]
+        new_sql, new_row_count = new_summary[table]
+        if old_sql != new_sql:
+            result["schema-changed"].append(table)
+        if old_row_count != new_row_count:
+            result["row-count-changed"][table] = [old_row_count, new_row_count]
+    return result
+
+
+def file_digest(filename):
+    '''Return the SHA-256 hex digest of a file's contents.'''
+    import hashlib
+    digest = hashlib.sha256()
+    with open(filename, "rb") as input_file:
+        for block in iter(lambda: input_file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_proposal_manifest(proposed_directory, manifest_filename):
+    '''Write a manifest of the SHA-256 digest and size of every file in the proposal.
+       Digests computed while copying are reused; other files, such as those
+       synthesized or changed after copying, are read once here.'''
+    files = {}
+    for root, _, filenames in os.walk(proposed_directory):
+        for filename in filenames:
+            pathname = os.path.normpath(os.path.join(root, filename))
+            stat = os.stat(pathname)
+            digest, size, mtime_ns = proposed_file_digests.get(pathname, (None, None, None))
+            if (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+                digest = file_digest(pathname)
+            files[os.path.relpath(pathname, proposed_directory)] = {
+                "sha256": digest,
+                "bytes": stat.st_size,
+            }
+    manifest = {
+        "version": __version__,
+        "proposed_senzing_directory": proposed_directory,
+        "files": files,
+    }
+    with open(manifest_filename, "w") as manifest_file:
+        json.dump(manifest, manifest_file, sort_keys=True, indent=4)
+    logging.info("make-file: {0}".format(manifest_filename))
+    return manifest
+
+
+def verify_proposal(proposed_directory, manifest, workers=None):
+    '''Check the files of a proposal against a manifest from write_proposal_manifest().
+       Files are hashed by a pool of "workers" threads.  Returns a dictionary
+       of files missing, changed, and not in the manifest ("unexpected").'''
+    import concurrent.futures
+
+    def check(relative_filename, expected):
+        pathname = os.path.join(proposed_directory, relative_filename)
+        if not os.path.isfile(pathname):
+            return "missing"
+        if os.path.getsize(pathname) != expected["bytes"] or file_digest(pathname) != expected["sha256"]:
+            return "changed"
+        return None
+
+    result = {
+        "missing": [],
+        "changed": [],
+        "unexpected": [],
+    }
+    files = manifest["files"]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        problems = executor.map(check, files.keys(), files.values())
+        for relative_filename, problem in zip(files.keys(), problems):
+            if problem:
+                result[problem].append(relative_filename)
+
+    # Files added to the proposal after the manifest was written.
+
+    for root, _, filenames in os.walk(proposed_directory):
+        for filename in filenames:
+            relative_filename = os.path.relpath(os.path.join(root, filename), proposed_directory)
+            if relative_filename not in files:
+                result["unexpected"].append(relative_filename)
+
+    for problems in result.values():
+        problems.sort()
+    return result
+
+
+def import_zstd():
+    '''Return a zstd module: compression.zstd (Python 3.14+) or the optional "zstandard" package.'''
+    try:
+        from compression import zstd
+    except ImportError:
+        try:
+            import zstandard as zstd
+        except ImportError:
+            logging.error("Error: zstd compression needs Python 3.14 or the zstandard package")
+            sys.exit(1)
+    return zstd
+
+
+def compression_of(filename, mode="r"):
+    '''Return "gzip", "xz", "zstd", or None for a file.  Files being read are
+       recognized by their magic bytes, files being written by their extension.'''
+    if "r" in mode:
+        with open(filename, "rb") as input_file:
+            magic = input_file.read(max(len(magic) for _, _, magic in compressed_file_types))
+        matches = [name for name, _, file_magic in compressed_file_types if magic.startswith(file_magic)]
+    else:
+        matches = [name for name, extension, _ in compressed_file_types if filename.endswith(extension)]
+    return matches[0] if matches else None
+
+
+def open_compressed(filename, mode="r"):
+    '''Open a text file that may be gzip, xz, or zstd compressed.
+       Data is compressed or decompressed as it is read or written.'''
+    compression = compression_of(filename, mode)
+    text_mode = mode if "t" in mode else "{0}t".format(mode)
+    if compression == "gzip":
+        import gzip
+        return gzip.open(filename, text_mode, encoding="utf-8")
+    if compression == "xz":
+        import lzma
+        return lzma.open(filename, text_mode, encoding="utf-8")
+    if compression == "zstd":
+        return import_zstd().open(filename, text_mode, encoding="utf-8")
+    return open(filename, mode)
+
+
+def g2config_cache_key(existing_filename, template_filename, g2config_blacklist_filename, output_compression=None):
+    '''Return a cache key for a migrate-g2config result.  The key is a digest of the
+       input file contents, the unique key schema, the compression of the output
+       file, and the version of migrate.py.'''
+    import hashlib
+    digest = hashlib.sha256()
+    digest.update(file_digest(existing_filename).encode())
+    digest.update(file_digest(template_filename).encode())
+    if g2config_blacklist_filename and os.path.isfile(g2config_blacklist_filename):
+        digest.update(file_digest(g2config_blacklist_filename).encode())
+    else:
+        digest.update(b"no-blacklist")
+    digest.update(json.dumps(list_element_unique_keys, sort_keys=True).encode())
+    digest.update(str(output_compression).encode())
+    digest.update(__version__.encode())
+    return digest.hexdigest()
+
+
+def cache_get(cache_directory, key, output_filename):
+    '''If key is in the cache, copy the cached file to output_filename and return True.'''
+    from shutil import copyfile
+    cached_filename = os.path.join(cache_directory, "{0}.json".format(key))
+    if not os.path.isfile(cached_filename):
+        return False
+    copyfile(cached_filename, output_filename)
+
+    # Mark as recently used.
+
+    os.utime(cached_filename)
+    return True
+
+
+def cache_put(cache_directory, key, filename, max_bytes):
+    '''Store a copy of filename in the cache, then evict least recently used
+       entries until the cache is no larger than max_bytes.'''
+    from shutil import copyfile
+    if not os.path.exists(cache_directory):
+        os.makedirs(cache_directory)
+    cached_filename = os.path.join(cache_directory, "{0}.json".format(key))
+    temporary_filename = "{0}.{1}.tmp".format(cached_filename, os.getpid())
+    copyfile(filename, temporary_filename)
+    os.replace(temporary_filename, cached_filename)
+
+    # Evict least recently used entries.
+
+    entries = []
+    for entry in os.scandir(cache_directory):
+        if entry.is_file() and entry.name.endswith(".json"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total_bytes <= max_bytes or path == cached_filename:
+            continue
+        logging.debug("cache-evict: {0}".format(path))
+        os.remove(path)
+        total_bytes -= size
+
+
+def compare_open_files(old_file, new_file, size):
+    '''Compare two open files of the same, non-zero size.  The head and tail
+       are sampled first so that differing files usually exit early.'''
+    import mmap
+    try:
+        old_map = mmap.mmap(old_file.fileno(), 0, access=mmap.ACCESS_READ)
+        new_map = mmap.mmap(new_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        old_map = new_map = None
+
+    # Fall back to buffered reads if the files cannot be memory-mapped.
+
+    if old_map is None:
+        while True:
+            old_buffer = old_file.read(file_compare_stride_size)
+            if old_buffer != new_file.read(file_compare_stride_size):
+                return False
+            if not old_buffer:
+                return True
+
+    with old_map, new_map:
+
+        # Sample head and tail blocks.
+
+        sample_size = min(file_compare_sample_size, size)
+        if old_map[:sample_size] != new_map[:sample_size]:
+            return False
+        if old_map[size - sample_size:] != new_map[size - sample_size:]:
+            return False
+
+        # Compare the remainder in large strides.
+
+        for offset in range(sample_size, size - sample_size, file_compare_stride_size):
+            end = min(offset + file_compare_stride_size, size - sample_size)
+            if old_map[offset:end] != new_map[offset:end]:
+                return False
+    return True
+
+
+def files_equal(old_filename, new_filename, trust_mtime=False, old_stat=None, new_stat=None):
+    '''Determine if two files have the same contents.  Files of different sizes
+       are never read.  If trust_mtime, files with the same size and
+       modification time are considered equal without being read.
+       Stat results already known, for example from os.scandir(), may be given.'''
+    old_stat = old_stat or os.stat(old_filename)
+    new_stat = new_stat or os.stat(new_filename)
+    if old_stat.st_size != new_stat.st_size:
+        return False
+    if trust_mtime and old_stat.st_mtime_ns == new_stat.st_mtime_ns:
+        return True
+    if old_stat.st_size == 0:
+        return True
+    with open(old_filename, "rb") as old_file, open(new_filename, "rb") as new_file:
+        return compare_open_files(old_file, new_file, old_stat.st_size)
+
+
+def scan_directory_diff(left, right, compare_contents=True, recursive=True):
+    '''Recursively compare directories "left" and "right" using os.scandir().
+       Returns a DirectoryDiff.  Its left_entries and right_entries map names to
+       os.DirEntry objects whose cached stat results are reused by later stages.
+       Files are different if their sizes differ.  Files with the same size and
+       modification time are the same.  Otherwise, if compare_contents, contents
+       are compared; if not, the files are different.
+       If right is None or does not exist, everything in left is "left only".
+       If not recursive, subdirs map names of common directories to None.'''
+    left_entries = {entry.name: entry for entry in os.scandir(left) if entry.name not in directory_diff_ignores}
+    right_entries = {}
+    if right is not None and os.path.isdir(right):
+        right_entries = {entry.name: entry for entry in os.scandir(right) if entry.name not in directory_diff_ignores}
+
+    left_only = sorted(name for name in left_entries if name not in right_entries)
+    right_only = sorted(name for name in right_entries if name not in left_entries)
+    diff_files = []
+    subdirs = {}
+    for name in sorted(name for name in left_entries if name in right_entries):
+        left_entry = left_entries[name]
+        right_entry = right_entries[name]
+
+        # Recurse into common directories.  A name that is a directory on only one side is skipped.
+
+        if left_entry.is_dir():
+            if right_entry.is_dir():
+                subdirs[name] = scan_directory_diff(left_entry.path, right_entry.path, compare_contents) if recursive else None
+            continue
+        if not (left_entry.is_file() and right_entry.is_file()):
+            continue
+
+        # Compare files.
+
+        left_stat = left_entry.stat()
+        right_stat = right_entry.stat()
+        progress.compared()
+        if left_stat.st_size != right_stat.st_size:
+            diff_files.append(name)
+        elif left_stat.st_mtime_ns == right_stat.st_mtime_ns:
+            continue
+        elif not compare_contents or not files_equal(left_entry.path, right_entry.path, old_stat=left_stat, new_stat=right_stat):
+            diff_files.append(name)
+    return DirectoryDiff(left, right, left_only, right_only, diff_files, subdirs, left_entries, right_entries)
 
 
 def keyed_needle_in_haystack(key, needle, haystack):
     '''Determine if a "needle" is in the "haystack". The needle
        is determined by "key" as an index into list_element_unique_keys.'''
-    result = False
-    default_for_missing_value = "!no-key-value!"
 
-    # Get the keys that represent the "compound unique key".
+    # Get the extractors that represent the "compound unique keys".
 
-    unique_keys_list = list_element_unique_keys.get(key, [])
-    for unique_keys in unique_keys_list:
+    for extractor in list_element_unique_key_extractors.get(key, []):
+        needle_value = extractor(needle)
 
         # Go through the haystack to see if anything matches the "needle".
 
         for haystack_element in haystack:
+            if extractor(haystack_element) == needle_value:
+                return True
 
-            # Determine if an element from the haystack matches the needle.
-            # Assume it matches until a difference is found.
+    return False
 
-            matches = True
-            for unique_key in unique_keys:
-                unique_key_value = needle.get(unique_key, default_for_missing_value)
-                haystack_element_key_value = haystack_element.get(unique_key, default_for_missing_value)
-                if unique_key_value != haystack_element_key_value:
-                    matches = False
-            if matches:
-                return True
 
-    return result
+def make_unique_key_extractor(unique_keys):
+    '''Create a function that returns the "compound unique key" value of a list element.
+       Missing keys are given the value of default_for_missing_value.'''
+    getter = operator.itemgetter(*unique_keys)
+
+    if len(unique_keys) == 1:
+        unique_key = unique_keys[0]
+
+        def fallback(element):
+            return element.get(unique_key, default_for_missing_value)
+    else:
+
+        def fallback(element):
+            return tuple(element.get(unique_key, default_for_missing_value) for unique_key in unique_keys)
+
+    def extractor(element):
+        try:
+            return getter(element)
+        except KeyError:
+            return fallback(element)
+
+    return extractor
+
+
+def validate_list_element_unique_keys(unique_keys_dictionary):
+    '''Return a list of error messages describing problems in a unique key schema.'''
+    errors = []
+    if not isinstance(unique_keys_dictionary, collections.abc.Mapping):
+        return ["schema must be a JSON object, not {0}".format(type(unique_keys_dictionary).__name__)]
+    for key, unique_keys_list in unique_keys_dictionary.items():
+        if not isinstance(unique_keys_list, list):
+            errors.append("{0}: value must be a list of lists".format(key))
+            continue
+        for unique_keys in unique_keys_list:
+            if not isinstance(unique_keys, list) or not unique_keys:
+                errors.append("{0}: {1} must be a non-empty list of JSON keys".format(key, unique_keys))
+            elif not all(isinstance(unique_key, str) for unique_key in unique_keys):
+                errors.append("{0}: {1} must contain only strings".format(key, unique_keys))
+    return errors
+
+
+def set_list_element_unique_keys(unique_keys_dictionary):
+    '''Replace list_element_unique_keys and recompile list_element_unique_key_extractors.'''
+    if unique_keys_dictionary is not list_element_unique_keys:
+        list_element_unique_keys.clear()
+        list_element_unique_keys.update(unique_keys_dictionary)
+    list_element_unique_key_extractors.clear()
+    for key, unique_keys_list in list_element_unique_keys.items():
+        list_element_unique_key_extractors[key] = [make_unique_key_extractor(unique_keys) for unique_keys in unique_keys_list]
+
+
+def load_list_element_unique_keys(unique_keys_filename):
+    '''Load and validate a unique key schema from a JSON or YAML file.
+       On success, the schema replaces list_element_unique_keys.'''
+
+    if not os.path.isfile(unique_keys_filename):
+        logging.error("Error: {0} does not exist".format(unique_keys_filename))
+        sys.exit(1)
+
+    # Load the schema.
+
+    with open(unique_keys_filename) as unique_keys_file:
+        if unique_keys_filename.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                logging.error("Error: PyYAML is needed to read {0}".format(unique_keys_filename))
+                sys.exit(1)
+            unique_keys_dictionary = yaml.safe_load(unique_keys_file)
+        else:
+            unique_keys_dictionary = json.load(unique_keys_file)
+
+    # Validate the schema.
+
+    errors = validate_list_element_unique_keys(unique_keys_dictionary)
+    if errors:
+        for error in errors:
+            logging.error("Error: {0}: {1}".format(unique_keys_filename, error))
+        sys.exit(1)
+
+    set_list_element_unique_keys(unique_keys_dictionary)
+    logging.info("unique-keys: {0}".format(unique_keys_filename))
+
+
+# Compile the built-in unique key schema.
+
+set_list_element_unique_keys(list_element_unique_keys)
 
 
 def safe_list_get (the_list, list_index, default):
@@ -236,12 +1108,12 @@ def safe_list_get (the_list, list_index, default):
 
 
 def files_from_list(files_list, old_directory, new_directory, proposed_directory):
-    '''This is a python generator to create full pathnames.'''
+    '''This is a python generator to create full pathnames.  Yields a PathMapping per entry.'''
     for files in files_list:
         old = safe_list_get(files, 0, "").format(old_directory, new_directory, proposed_directory)
         new = safe_list_get(files, 1, "").format(old_directory, new_directory, proposed_directory)
         proposed = safe_list_get(files, 2, "").format(old_directory, new_directory, proposed_directory)
-        yield old, new, proposed
+        yield PathMapping(old, new, proposed)
 
 
 def log_directory_diff(directory_diff):
@@ -287,7 +1159,7 @@ def dictionary_difference(minuend, subtrahend):
 
         # Handle maps.
 
-        if isinstance(value, collections.Mapping):
+        if isinstance(value, collections.abc.Mapping):
             recursive_value = dictionary_difference(value, subtrahend.get(key, {}))
             if recursive_value:
                 result[key] = recursive_value
@@ -308,6 +1180,410 @@ def dictionary_difference(minuend, subtrahend):
             result[key] = value
     return result
 
+# Patterns used by JsonStreamReader.
+
+json_whitespace = re.compile(r"[ \t\n\r]*")
+json_number_characters = re.compile(r"[0-9.eE+-]*")
+
+
+class JsonStreamReader(object):
+    '''Read a JSON document from a file a block at a time.  Objects and
+       lists are walked by iter_json_stream(); other values, including list
+       elements, are decoded whole by read_value().  The buffer holds about
+       one block plus the value being decoded.'''
+
+    def __init__(self, input_file, block_size=file_copy_block_size):
+        self.input_file = input_file
+        self.block_size = block_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        '''Drop what has been read and read another block.  Returns False at end of file.'''
+        if self.eof:
+            return False
+        block = self.input_file.read(max(self.block_size, len(self.buffer) - self.position))
+        if not block:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + block
+        self.position = 0
+        return True
+
+    def peek(self):
+        '''Return the next character that is not whitespace, or "" at end of file.'''
+        while True:
+            self.position = json_whitespace.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                return ""
+
+    def accept(self, character):
+        '''If the next character is "character", read it and return True.'''
+        if self.peek() == character:
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, character):
+        '''Read "character" or raise ValueError.'''
+        if not self.accept(character):
+            raise ValueError("Expected {0!r} but found {1!r}".format(character, self.peek()))
+
+    def read_value(self):
+        '''Read and decode one complete JSON value.'''
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+
+                # A number followed only by number characters up to the end of
+                # the buffer, such as "1" of "1.25", may continue in the next block.
+
+                is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+                if self.eof or not (is_number and json_number_characters.match(self.buffer, end).end() == len(self.buffer)):
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+
+def iter_json_stream(reader, path=()):
+    '''Walk the JSON object being read by a JsonStreamReader.  Yields
+       ("map", path, None) for each non-empty object, ("element", path, value)
+       for each list element, and ("scalar", path, value) for other values.
+       "path" is the tuple of keys leading to the value.'''
+    reader.expect("{")
+    if reader.accept("}"):
+        return
+    yield "map", path, None
+    while True:
+        key = reader.read_value()
+        reader.expect(":")
+        key_path = path + (key,)
+        character = reader.peek()
+        if character == "{":
+            yield from iter_json_stream(reader, key_path)
+        elif character == "[":
+            reader.expect("[")
+            if not reader.accept("]"):
+                while True:
+                    yield "element", key_path, reader.read_value()
+                    if not reader.accept(","):
+                        break
+                reader.expect("]")
+        else:
+            yield "scalar", key_path, reader.read_value()
+        if not reader.accept(","):
+            break
+    reader.expect("}")
+
+
+def out_of_core_dictionary_difference(minuend_filename, subtrahend_filename, temporary_directory=None):
+    '''Like dictionary_difference(), for JSON files larger than memory.
+       Each list of the subtrahend is spilled as a set of element hashes to a
+       temporary SQLite index, then the minuend is streamed through the index.
+       Only the difference, and one list element at a time, are held in memory.'''
+    import hashlib
+    import sqlite3
+    import tempfile
+
+    def element_digest(value):
+        return hashlib.sha256(canonical_json(value).encode("utf-8")).digest()[:16]
+
+    with tempfile.TemporaryDirectory(dir=temporary_directory) as index_directory:
+        connection = sqlite3.connect(os.path.join(index_directory, "json-difference-index.db"))
+        try:
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+
+            # "elements" holds the hash set of each list.  "present" holds the
+            # paths of values that are true, which hide scalars of the minuend.
+
+            connection.execute("CREATE TABLE elements (path TEXT, digest BLOB, PRIMARY KEY (path, digest)) WITHOUT ROWID")
+            connection.execute("CREATE TABLE present (path TEXT PRIMARY KEY) WITHOUT ROWID")
+
+            # Index the subtrahend.
+
+            element_rows = []
+            present_rows = []
+            with open_compressed(subtrahend_filename) as subtrahend_file:
+                for event, path, value in iter_json_stream(JsonStreamReader(subtrahend_file)):
+                    path_key = json.dumps(path)
+                    if event == "element":
+                        element_rows.append((path_key, element_digest(value)))
+                    if event != "scalar" or value:
+                        present_rows.append((path_key,))
+                    if len(element_rows) + len(present_rows) >= 10000:
+                        connection.executemany("INSERT OR IGNORE INTO elements VALUES (?, ?)", element_rows)
+                        connection.executemany("INSERT OR IGNORE INTO present VALUES (?)", present_rows)
+                        element_rows = []
+                        present_rows = []
+            connection.executemany("INSERT OR IGNORE INTO elements VALUES (?, ?)", element_rows)
+            connection.executemany("INSERT OR IGNORE INTO present VALUES (?)", present_rows)
+            connection.commit()
+
+            # Stream the minuend through the index.
+
+            result = {}
+            with open_compressed(minuend_filename) as minuend_file:
+                for event, path, value in iter_json_stream(JsonStreamReader(minuend_file)):
+                    if event == "map":
+                        continue
+                    path_key = json.dumps(path)
+                    if event == "element":
+                        found = connection.execute("SELECT 1 FROM elements WHERE path = ? AND digest = ?", (path_key, element_digest(value))).fetchone()
+                    else:
+                        found = connection.execute("SELECT 1 FROM present WHERE path = ?", (path_key,)).fetchone()
+                    if found:
+                        continue
+                    node = result
+                    for key in path[:-1]:
+                        node = node.setdefault(key, {})
+                    if event == "element":
+                        node.setdefault(path[-1], []).append(value)
+                    else:
+                        node[path[-1]] = value
+        finally:
+            connection.close()
+    return result
+
+
+def count_list_elements(dictionary):
+    '''Return the number of list elements in lists anywhere in a dictionary.'''
+    result = 0
+    for value in dictionary.values():
+        if isinstance(value, collections.abc.Mapping):
+            result += count_list_elements(value)
+        elif isinstance(value, list):
+            result += len(value)
+    return result
+
+
+def find_lists(dictionary, result=None):
+    '''Return a dictionary of JSON key to list for lists anywhere in a dictionary.
+       If a JSON key names more than one list, the first found is returned.'''
+    if result is None:
+        result = {}
+    for key, value in dictionary.items():
+        if isinstance(value, collections.abc.Mapping):
+            find_lists(value, result)
+        elif isinstance(value, list):
+            result.setdefault(key, value)
+    return result
+
+
+def g2config_dangling_references(g2config_dictionary):
+    '''Return a list of references, by g2config_foreign_keys, to list elements that do not exist.
+       Each referred-to list is indexed once with its extractor from
+       list_element_unique_key_extractors, then each referring list is checked in one pass.'''
+    lists = find_lists(g2config_dictionary)
+
+    # Index the referred-to lists.
+
+    indexes = {}
+    for references in g2config_foreign_keys.values():
+        for key, referenced_list_name in references.items():
+            if (referenced_list_name, key) in indexes:
+                continue
+            unique_keys_list = list_element_unique_keys.get(referenced_list_name, [])
+            if [key] not in unique_keys_list:
+                logging.warning("{0} is not a unique key of {1}. References are not checked.".format(key, referenced_list_name))
+                indexes[(referenced_list_name, key)] = None
+                continue
+            extractor = list_element_unique_key_extractors[referenced_list_name][unique_keys_list.index([key])]
+            indexes[(referenced_list_name, key)] = set(map(extractor, lists.get(referenced_list_name, [])))
+
+    # Check references.
+
+    result = []
+    for list_name, references in sorted(g2config_foreign_keys.items()):
+        checks = [(key, referenced_list_name, indexes[(referenced_list_name, key)]) for key, referenced_list_name in sorted(references.items())]
+        checks = [check for check in checks if check[2] is not None]
+        for list_index, list_element in enumerate(lists.get(list_name, [])):
+            for key, referenced_list_name, index in checks:
+                value = list_element.get(key)
+                if value not in g2config_no_reference_values and value not in index:
+                    result.append({
+                        "list": list_name,
+                        "index": list_index,
+                        "key": key,
+                        "value": value,
+                        "references": referenced_list_name,
+                    })
+    return result
+
+
+def validate_g2config_file(filename, output_filename=None):
+    '''Log dangling references in a g2config.json file, and write them to output_filename.
+       Returns the number of dangling references.'''
+    with open_compressed(filename) as input_file:
+        g2config_dictionary = json.load(input_file)
+    dangling_references = g2config_dangling_references(g2config_dictionary)
+    for dangling_reference in dangling_references:
+        logging.error("dangling-reference: {0}[{1}].{2} = {3} not in {4}".format(
+            dangling_reference["list"], dangling_reference["index"], dangling_reference["key"], json.dumps(dangling_reference["value"]), dangling_reference["references"]))
+    if output_filename:
+        with open_compressed(output_filename, "w") as output_file:
+            json.dump(dangling_references, output_file, sort_keys=True, indent=4)
+        logging.info("make-file: {0}".format(output_filename))
+    logging.info("validate-g2config: {0} dangling references in {1}".format(len(dangling_references), filename))
+    return len(dangling_references)
+
+
+def canonical_json(value):
+    '''Return a string that is equal for equal JSON values, usable as a hash key.'''
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+def dictionary_delta(base_dictionary, update_dictionary):
+    '''Return the changes that turn base_dictionary into update_dictionary.
+       Each key of the result maps to one of:
+         ("mapping", sub_delta)
+         ("list", added_elements, removed_elements)
+         ("value", base_value, update_value)
+       Missing values are given as missing_value.'''
+    result = {}
+    keys = list(update_dictionary) + [key for key in base_dictionary if key not in update_dictionary]
+    for key in keys:
+        base_value = base_dictionary.get(key, missing_value)
+        update_value = update_dictionary.get(key, missing_value)
+
+        # Handle maps.  A new map is compared against an empty map.
+
+        if isinstance(update_value, collections.abc.Mapping) and (base_value is missing_value or isinstance(base_value, collections.abc.Mapping)):
+            sub_delta = dictionary_delta({} if base_value is missing_value else base_value, update_value)
+            if sub_delta:
+                result[key] = ("mapping", sub_delta)
+
+        # Handle lists.  Elements are compared by their canonical JSON.
+
+        elif isinstance(update_value, list) and (base_value is missing_value or isinstance(base_value, list)):
+            base_hashes = {canonical_json(element) for element in ([] if base_value is missing_value else base_value)}
+            update_hashes = {}
+            for element in update_value:
+                update_hashes.setdefault(canonical_json(element), element)
+            added_elements = [element for element_hash, element in update_hashes.items() if element_hash not in base_hashes]
+            removed_elements = [element for element in ([] if base_value is missing_value else base_value) if canonical_json(element) not in update_hashes]
+            if added_elements or removed_elements:
+                result[key] = ("list", added_elements, removed_elements)
+
+        # Handle everything else, including changes of type.
+
+        elif base_value != update_value:
+            result[key] = ("value", base_value, update_value)
+    return result
+
+
+def apply_list_delta(key, original_list, added_elements, removed_elements, path, conflicts):
+    '''Apply list changes to original_list.  Elements are matched using
+       list_element_unique_key_extractors for "key".  An added element whose
+       unique key matches a different element in original_list is not added;
+       it is reported in conflicts.'''
+
+    # Remove elements the update removed, if unchanged in original_list.
+
+    if removed_elements:
+        removed_hashes = {canonical_json(element) for element in removed_elements}
+        original_list[:] = [element for element in original_list if canonical_json(element) not in removed_hashes]
+
+    if not added_elements:
+        return
+
+    # Without unique keys, fall back to whole-element comparison.
+
+    extractors = list_element_unique_key_extractors.get(key, [])
+    if not extractors:
+        original_hashes = {canonical_json(element) for element in original_list}
+        for element in added_elements:
+            element_hash = canonical_json(element)
+            if element_hash not in original_hashes:
+                original_list.append(element)
+                original_hashes.add(element_hash)
+        return
+
+    # Index original_list by each "compound unique key".
+
+    indexes = [{} for extractor in extractors]
+    for element in original_list:
+        for extractor, index in zip(extractors, indexes):
+            index.setdefault(extractor(element), element)
+
+    for element in added_elements:
+        element_keys = [extractor(element) for extractor in extractors]
+        conflict = None
+        for unique_keys, element_key, index in zip(list_element_unique_keys[key], element_keys, indexes):
+            if element_key in index:
+                conflict = (unique_keys, element_key, index[element_key])
+                break
+        if conflict is None:
+            original_list.append(element)
+            for element_key, index in zip(element_keys, indexes):
+                index[element_key] = element
+        elif conflict[2] != element:
+            unique_keys, element_key, original_element = conflict
+            conflicts.append({
+                "path": path + [key],
+                "unique_keys": unique_keys,
+                "key": list(element_key) if isinstance(element_key, tuple) else element_key,
+                "existing": original_element,
+                "template": element,
+            })
+
+
+def apply_dictionary_delta(original_dictionary, delta, path, conflicts):
+    '''Apply a delta from dictionary_delta() to original_dictionary.  Values changed
+       in both original_dictionary and the delta are not changed; they are
+       reported in conflicts.
+       Note: original_dictionary is modified by this function.'''
+    for key, change in delta.items():
+        original_value = original_dictionary.get(key, missing_value)
+
+        # Handle maps.
+
+        if change[0] == "mapping":
+            if original_value is missing_value:
+                original_value = original_dictionary[key] = {}
+            if isinstance(original_value, collections.abc.Mapping):
+                apply_dictionary_delta(original_value, change[1], path + [key], conflicts)
+            else:
+                conflicts.append({"path": path + [key], "existing": original_value, "template": "<JSON object>"})
+
+        # Handle lists.
+
+        elif change[0] == "list":
+            if original_value is missing_value:
+                original_value = original_dictionary[key] = []
+            if isinstance(original_value, list):
+                apply_list_delta(key, original_value, change[1], change[2], path, conflicts)
+            else:
+                conflicts.append({"path": path + [key], "existing": original_value, "template": "<JSON array>"})
+
+        # Handle values.  Change only values that still equal the base value.
+
+        else:
+            _, base_value, update_value = change
+            if original_value == update_value:
+                continue
+            if original_value is missing_value or original_value == base_value:
+                if update_value is missing_value:
+                    original_dictionary.pop(key, None)
+                else:
+                    original_dictionary[key] = update_value
+            else:
+                conflicts.append({
+                    "path": path + [key],
+                    "base": None if base_value is missing_value else base_value,
+                    "existing": original_value,
+                    "template": None if update_value is missing_value else update_value,
+                })
+    return original_dictionary
+
 # -----------------------------------------------------------------------------
 # log_* functions
 #   Common function signature: log_XXX(files_list, old_dir, new_dir)
@@ -317,7 +1593,7 @@ def dictionary_difference(minuend, subtrahend):
 def log_file_differences(files_list, old_directory, new_directory):
     '''Compare files and log any file differences detected.'''
     for old, new, _ in files_from_list(files_list, old_directory, new_directory, "") :
-        if not filecmp.cmp(old, new, shallow=False):
+        if not files_equal(old, new, trust_mtime=old in immutable_files):
             logging.info(log_file_diff_template.format(old, new))
 
 
@@ -325,11 +1601,32 @@ def log_directory_differences(directories_list, old_directory, new_directory, pr
     '''Compare old_directory and new_directory and log what was removed, added, or changed.'''
     for old, new, proposed in files_from_list(directories_list, old_directory, new_directory, proposed_directory):
         if os.path.exists(old):
-            directory_diff = filecmp.dircmp(old, new)
+            directory_diff = scan_directory_diff(old, new)
             log_directory_old(directory_diff)
             log_directory_new(directory_diff)
             log_directory_diff(directory_diff)
 
+
+def log_sqlite_differences(files_list, old_directory, new_directory):
+    '''Compare SQLite databases and log table-level differences.'''
+    import sqlite3
+    for old, new, _ in files_from_list(files_list, old_directory, new_directory, ""):
+        if not (os.path.exists(old) and os.path.exists(new)):
+            continue
+        try:
+            difference = sqlite_database_difference(old, new)
+        except sqlite3.DatabaseError as err:
+            logging.warning("Cannot compare {0} {1}: {2}".format(old, new, err))
+            continue
+        for table in difference["old-only"]:
+            logging.info("sqlite-old-only: {0} {1}".format(old, table))
+        for table in difference["new-only"]:
+            logging.info("sqlite-new-only: {0} {1}".format(new, table))
+        for table in difference["schema-changed"]:
+            logging.info("sqlite-schema-changed: {0} {1} {2}".format(old, new, table))
+        for table, (old_row_count, new_row_count) in difference["row-count-changed"].items():
+            logging.info("sqlite-rows-changed: {0} {1} {2} {3} {4}".format(old, new, table, old_row_count, new_row_count))
+
 # -----------------------------------------------------------------------------
 # propose_* functions
 #   Common function signature: propose_XXX(list, old_dir, new_dir, propose_dir)
@@ -348,25 +1645,28 @@ def propose_copy_files_from_old(files_list, old_directory, new_directory, propos
         copy_file(old, proposed)
 
 
-def propose_diff_and_copy_directories_from_old(directories_list, old_directory, new_directory, proposed_directory):
-    '''Copy changed files in a directory from old to proposed.'''
-    for old, new, proposed in files_from_list(directories_list, old_directory, new_directory, proposed_directory):
-        if os.path.exists(old):
-            directory_diff = filecmp.dircmp(old, new)
-            handle_directory_diff(directory_diff, old, new, proposed)
-        else:
-            logging.error("Directory {0} does not exist".format(old))
+def propose_changed_files_from_old(files_list, old_directory, new_directory, proposed_directory):
+    '''Return (old, proposed) pairs of changed files in a list, after adding them to the progress totals.'''
+    result = []
+    for old, new, proposed in files_from_list(files_list, old_directory, new_directory, proposed_directory):
+        if not os.path.exists(old) or old in blacklist:
+            pass
+        elif not os.path.exists(new) or not files_equal(old, new, trust_mtime=old in immutable_files):
+            result.append((old, proposed))
+    progress.add_totals(files=len(result), byte_count=sum(os.path.getsize(old) for old, proposed in result))
+    return result
 
 
 def propose_diff_and_copy_files_from_old(files_list, old_directory, new_directory, proposed_directory):
     '''Copy changed files in a list from old to proposed.'''
-    for old, new, proposed in files_from_list(files_list, old_directory, new_directory, proposed_directory):
-        if not os.path.exists(old):
-            pass
-        elif not os.path.exists(new):
-            copy_file(old, proposed)
-        elif not filecmp.cmp(old, new, shallow=False):
-            copy_file(old, proposed)
+    for old, proposed in propose_changed_files_from_old(files_list, old_directory, new_directory, proposed_directory):
+        copy_file(old, proposed)
+
+
+def propose_diff_and_copy_sqlite_files_from_old(files_list, old_directory, new_directory, proposed_directory):
+    '''Copy changed SQLite databases in a list from old to proposed using the SQLite backup API.'''
+    for old, proposed in propose_changed_files_from_old(files_list, old_directory, new_directory, proposed_directory):
+        copy_sqlite_database(old, proposed)
 
 
 def propose_g2_python_g2config_json(old_directory, new_directory, proposed_directory, g2config_blacklist_filename):
@@ -381,7 +1681,7 @@ def propose_g2_python_g2config_json(old_directory, new_directory, proposed_direc
     # Create output directory.
 
     output_directory = "{0}/g2/python".format(proposed_directory)
-    if not os.path.exists(output_directory):
+    if not proposal_archive.is_open() and not os.path.exists(output_directory):
         os.makedirs(output_directory)
 
     # Verify existence of files.
@@ -406,6 +1706,7 @@ def propose_g2_python_g2config_json(old_directory, new_directory, proposed_direc
 
     # Do the transformation.
 
+    progress.add_totals(rows=count_list_elements(template_dictionary))
     result_dictionary = transform_add_list_unique_elements(existing_dictionary, template_dictionary)
 
     # Perform blacklist operation.
@@ -417,11 +1718,312 @@ def propose_g2_python_g2config_json(old_directory, new_directory, proposed_direc
 
     # Write output.
 
-    with open(output_filename, "w") as output_file:
-        json.dump(result_dictionary, output_file, sort_keys=True, indent=4)
+    if proposal_archive.is_open():
+        proposal_archive.add_bytes(json.dumps(result_dictionary, sort_keys=True, indent=4).encode("utf-8"), output_filename)
+    else:
+        with open(output_filename, "w") as output_file:
+            json.dump(result_dictionary, output_file, sort_keys=True, indent=4)
 
     logging.info("make-file: {0}".format(output_filename))
 
+# -----------------------------------------------------------------------------
+# plan_* functions
+#   Common function signature: plan_XXX(list, old_dir, new_dir, propose_dir, plan)
+# -----------------------------------------------------------------------------
+
+
+def plan_copy(plan, old_file, new_file, size, kind="file", verify_file=None):
+    '''Add a copy of old_file to new_file to the plan, unless blacklisted.
+       If verify_file, the copy is made only if old_file and verify_file differ in content.'''
+    if old_file in blacklist:
+        plan["blacklisted"].append(old_file)
+        return
+    entry = {"source": old_file, "destination": new_file, "bytes": size, "kind": kind}
+    if verify_file:
+        entry["verify"] = verify_file
+    plan["copy"].append(entry)
+    plan["total_bytes"] += size
+    new_file_directory = os.path.dirname(new_file)
+    if new_file_directory not in plan["directories"] and not os.path.exists(new_file_directory):
+        plan["directories"].append(new_file_directory)
+
+
+def plan_directory_diff(directory_diff, path_mapping, plan):
+    '''Recursively plan copies of files from the old directory into the proposed
+       directory if the file only exists in the old directory, or if it has been
+       modified.  The stat results cached in directory_diff are used.'''
+    for name in directory_diff.diff_files + directory_diff.left_only:
+        old_entry = directory_diff.left_entries[name]
+        if old_entry.is_dir():
+            sub_path_mapping = path_mapping.join(name)
+            plan_directory_diff(scan_directory_diff(sub_path_mapping.old, None, compare_contents=False), sub_path_mapping, plan)
+        else:
+
+            # Without a content comparison, files of the same size are verified when the plan is applied.
+
+            new_entry = directory_diff.right_entries.get(name)
+            verify_file = None
+            if new_entry is not None and not new_entry.is_dir() and new_entry.stat().st_size == old_entry.stat().st_size:
+                verify_file = new_entry.path
+            plan_copy(plan, old_entry.path, os.path.join(path_mapping.proposed, name), old_entry.stat().st_size, verify_file=verify_file)
+
+    for name, sub_directory_diff in directory_diff.subdirs.items():
+        plan_directory_diff(sub_directory_diff, path_mapping.join(name), plan)
+
+
+def plan_diff_and_copy_directories_from_old(directories_list, old_directory, new_directory, proposed_directory, plan, compare_contents=False):
+    '''Plan copies of changed files in a directory from old to proposed.'''
+    for old, new, proposed in files_from_list(directories_list, old_directory, new_directory, proposed_directory):
+        if os.path.isdir(old):
+            directory_diff = scan_directory_diff(old, new, compare_contents=compare_contents)
+            plan_directory_diff(directory_diff, PathMapping(old, new, proposed), plan)
+        else:
+            logging.error("Directory {0} does not exist".format(old))
+
+
+def plan_diff_and_copy_files_from_old(files_list, old_directory, new_directory, proposed_directory, plan, kind="file", compare_contents=False):
+    '''Plan copies of files in a list that differ from old to proposed.
+       Files of a different size differ.  Immutable files with the same size and
+       modification time do not.  If compare_contents, other files of the same size
+       are compared now, like files_equal(); if not, they are verified when the plan is applied.'''
+    for old, new, proposed in files_from_list(files_list, old_directory, new_directory, proposed_directory):
+        if not os.path.exists(old):
+            continue
+        old_stat = os.stat(old)
+        verify_file = None
+        if os.path.exists(new):
+            new_stat = os.stat(new)
+            if compare_contents:
+                if files_equal(old, new, trust_mtime=old in immutable_files, old_stat=old_stat, new_stat=new_stat):
+                    continue
+            elif old_stat.st_size == new_stat.st_size:
+                if old in immutable_files and old_stat.st_mtime_ns == new_stat.st_mtime_ns:
+                    continue
+                verify_file = new
+        plan_copy(plan, old, proposed, old_stat.st_size, kind, verify_file)
+
+
+def measure_disk_throughput(directory, size=8 * 1024 * 1024):
+    '''Return bytes per second for writing a temporary file in directory.'''
+    import tempfile
+    block = b"\0" * (1024 * 1024)
+    with tempfile.TemporaryFile(dir=directory) as probe_file:
+        start_time = time.perf_counter()
+        for _ in range(size // len(block)):
+            probe_file.write(block)
+        probe_file.flush()
+        os.fsync(probe_file.fileno())
+        elapsed_time = time.perf_counter() - start_time
+    return size / max(elapsed_time, 1e-6)
+
+
+def new_migration_plan(old_directory, new_directory, proposed_directory, g2config_blacklist_filename):
+    '''Return a plan with nothing to copy.  plan_* functions add to it.'''
+    plan = {
+        "version": __version__,
+        "old_senzing_directory": old_directory,
+        "new_senzing_directory": new_directory,
+        "proposed_senzing_directory": proposed_directory,
+        "g2config_blacklist_filename": g2config_blacklist_filename,
+        "copy": [],
+        "blacklisted": [],
+        "directories": [],
+        "total_bytes": 0,
+    }
+    if not os.path.exists(proposed_directory):
+        plan["directories"].append(proposed_directory)
+    return plan
+
+
+def make_migration_plan(old_directory, new_directory, proposed_directory, g2config_blacklist_filename, throughput=None, compare_contents=False):
+    '''Plan a migrate-senzing-dir proposal using only file metadata, or, if
+       compare_contents, also comparing the contents of files of the same size.
+       The plan is a JSON-serializable dictionary for apply_migration_plan().
+       If throughput is False, the duration is not estimated.'''
+    plan = new_migration_plan(old_directory, new_directory, proposed_directory, g2config_blacklist_filename)
+
+    plan_diff_and_copy_directories_from_old(diff_directories_list, old_directory, new_directory, proposed_directory, plan, compare_contents)
+    plan_diff_and_copy_files_from_old(diff_files_list, old_directory, new_directory, proposed_directory, plan, "file", compare_contents)
+    plan_diff_and_copy_files_from_old(diff_sqlite_files_list, old_directory, new_directory, proposed_directory, plan, "sqlite", compare_contents)
+
+    # The proposed g2config.json is always created.
+
+    g2config_directory = "{0}/g2/python".format(proposed_directory)
+    if g2config_directory not in plan["directories"] and not os.path.exists(g2config_directory):
+        plan["directories"].append(g2config_directory)
+
+    # Estimate duration.
+
+    if throughput is False:
+        return plan
+    if not throughput:
+        probe_directory = os.path.dirname(os.path.abspath(proposed_directory))
+        throughput = measure_disk_throughput(probe_directory if os.path.isdir(probe_directory) else None)
+    plan["throughput_bytes_per_second"] = throughput
+    plan["estimated_seconds"] = plan["total_bytes"] / throughput
+    return plan
+
+
+def apply_migration_plan(plan):
+    '''Create the proposal described by a plan from make_migration_plan().
+       The old and new directories are not walked again.'''
+    copy_planned_files(plan)
+    propose_g2_python_g2config_json(plan["old_senzing_directory"], plan["new_senzing_directory"], plan["proposed_senzing_directory"], plan["g2config_blacklist_filename"])
+
+
+def copy_planned_files(plan):
+    '''Create the directories and copy the files of a plan.'''
+    if not proposal_archive.is_open():
+        for directory in plan["directories"]:
+            ensure_directory(directory)
+
+    # Files planned from metadata alone are copied only if their contents differ.
+
+    copies = []
+    for entry in plan["copy"]:
+        verify_file = entry.get("verify")
+        if entry["source"] in blacklist:
+            continue
+        if verify_file and os.path.exists(entry["source"]) and os.path.exists(verify_file) and files_equal(entry["source"], verify_file):
+            logging.info("unchanged: {0}".format(entry["source"]))
+            continue
+        copies.append(entry)
+
+    # All of the copies are known before the first one starts.
+
+    progress.add_totals(files=len(copies), byte_count=sum(entry["bytes"] for entry in copies))
+    for entry in copies:
+        if not os.path.exists(entry["source"]):
+            logging.error("File {0} does not exist".format(entry["source"]))
+            continue
+        if os.path.getsize(entry["source"]) != entry["bytes"]:
+            logging.warning("{0} has changed since the plan was made".format(entry["source"]))
+        if entry["kind"] == "sqlite":
+            copy_sqlite_database(entry["source"], entry["destination"])
+        else:
+            copy_file(entry["source"], entry["destination"])
+
+# -----------------------------------------------------------------------------
+# async_* functions
+#   Used by "migrate-senzing-dir --engine async".
+# -----------------------------------------------------------------------------
+
+
+async def async_handle_directory(path_mapping, copy_queue, listing_semaphore):
+    '''Like plan_directory_diff(), but queue files for async_copy_worker() and
+       descend into subdirectories concurrently.  Waiting on a full copy_queue
+       keeps the walk from running ahead of the copies.'''
+    import asyncio
+
+    async with listing_semaphore:
+        directory_diff = await asyncio.to_thread(scan_directory_diff, path_mapping.old, path_mapping.new, False, False)
+
+    sub_directories = []
+    for name in directory_diff.diff_files + directory_diff.left_only:
+        old_entry = directory_diff.left_entries[name]
+        sub_path_mapping = path_mapping.join(name)
+        if old_entry.is_dir():
+            sub_directories.append(PathMapping(sub_path_mapping.old, None, sub_path_mapping.proposed))
+            continue
+
+        # Blacklisted files are not copied.  Files of the same size need their contents compared.
+
+        if old_entry.path in blacklist:
+            continue
+        new_entry = directory_diff.right_entries.get(name)
+        compare = new_entry is not None and old_entry.stat().st_size == new_entry.stat().st_size
+        await copy_queue.put((sub_path_mapping, compare))
+
+    for name in directory_diff.subdirs:
+        sub_directories.append(path_mapping.join(name))
+
+    await asyncio.gather(*(async_handle_directory(sub_path_mapping, copy_queue, listing_semaphore) for sub_path_mapping in sub_directories))
+
+
+async def async_copy_worker(copy_queue, copy_errors, walk_task):
+    '''Compare and copy files queued by async_handle_directory() until a None is queued.
+       An unexpected error is appended to copy_errors and cancels walk_task.  The worker
+       keeps taking jobs, without copying them, so the walk is never left waiting on a full queue.'''
+    import asyncio
+    while True:
+        job = await copy_queue.get()
+        if job is None:
+            return
+        if copy_errors:
+            continue
+        path_mapping, compare = job
+        try:
+            if not compare or not await asyncio.to_thread(files_equal, path_mapping.old, path_mapping.new):
+                progress.add_totals(files=1, byte_count=os.path.getsize(path_mapping.old))
+                await asyncio.to_thread(copy_file, path_mapping.old, path_mapping.proposed, True)
+        except OSError as err:
+            logging.error("Cannot copy {0}: {1}".format(path_mapping.old, err))
+        except Exception as err:
+            logging.error("Cannot copy {0}: {1!r}".format(path_mapping.old, err))
+            copy_errors.append(err)
+            walk_task.cancel()
+
+
+async def async_propose_diff_and_copy_directories_from_old(directories_list, old_directory, new_directory, proposed_directory, concurrency):
+    '''Like plan_diff_and_copy_directories_from_old() and copy_planned_files(), with directory listing,
+       comparison, and copying overlapped.  At most "concurrency" files are
+       compared or copied at once.  The first unexpected copy error stops the
+       walk and is raised.'''
+    import asyncio
+
+    copy_queue = asyncio.Queue(maxsize=concurrency * 2)
+    listing_semaphore = asyncio.Semaphore(concurrency)
+
+    walks = []
+    for path_mapping in files_from_list(directories_list, old_directory, new_directory, proposed_directory):
+        if os.path.exists(path_mapping.old):
+            walks.append(async_handle_directory(path_mapping, copy_queue, listing_semaphore))
+        else:
+            logging.error("Directory {0} does not exist".format(path_mapping.old))
+    walk_task = asyncio.ensure_future(asyncio.gather(*walks))
+    copy_errors = []
+    workers = [asyncio.create_task(async_copy_worker(copy_queue, copy_errors, walk_task)) for _ in range(concurrency)]
+    try:
+        await walk_task
+    except asyncio.CancelledError:
+
+        # Cancelled by a worker, or by the caller.
+
+        if not copy_errors:
+            raise
+    finally:
+        for _ in workers:
+            await copy_queue.put(None)
+        await asyncio.gather(*workers)
+    if copy_errors:
+        raise copy_errors[0]
+
+
+async def async_migrate_senzing_dir(old_directory, new_directory, proposed_directory, concurrency):
+    '''Log differences and make the directory, file, and SQLite proposals of
+       migrate-senzing-dir at the same time.'''
+    import asyncio
+
+    log_directory_list = [["{0}", "{1}", "{2}"]]
+    await asyncio.gather(
+        asyncio.to_thread(log_directory_differences, log_directory_list, old_directory, new_directory, proposed_directory),
+        async_propose_diff_and_copy_directories_from_old(diff_directories_list, old_directory, new_directory, proposed_directory, concurrency),
+        asyncio.to_thread(propose_diff_and_copy_files_from_old, diff_files_list, old_directory, new_directory, proposed_directory),
+        asyncio.to_thread(propose_diff_and_copy_sqlite_files_from_old, diff_sqlite_files_list, old_directory, new_directory, proposed_directory),
+    )
+
+
+def run_async_migrate_senzing_dir(old_directory, new_directory, proposed_directory, concurrency):
+    '''Run async_migrate_senzing_dir() with a thread pool sized for "concurrency".'''
+    import asyncio
+    import concurrent.futures
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(concurrent.futures.ThreadPoolExecutor(max_workers=concurrency + 4))
+        await async_migrate_senzing_dir(old_directory, new_directory, proposed_directory, concurrency)
+
+    asyncio.run(main())
+
 # -----------------------------------------------------------------------------
 # transform_* functions
 #   Common function signature: result_dictionary = transform_XXX(original, update)
@@ -430,23 +2032,58 @@ def propose_g2_python_g2config_json(old_directory, new_directory, proposed_direc
 
 def transform_add_dsrc_etype(original_dictionary, update_dictionary):
     '''Insert G2_CONFIG.CFG_DSRC and G2_CONFIG.CFG_ETYPE into original dictionary.'''
+    import copy
     result_dictionary = copy.deepcopy(original_dictionary)
     result_dictionary["G2_CONFIG"]["CFG_DSRC"] = update_dictionary.get("G2_CONFIG", {}).get("CFG_DSRC", {})
     result_dictionary["G2_CONFIG"]['CFG_ETYPE'] = update_dictionary.get("G2_CONFIG", {}).get("CFG_ETYPE", {})
     return result_dictionary
 
 
+def make_key_template(update_dictionary):
+    '''Return (dictionary, key set, children) for update_dictionary, where
+       children maps each key holding a nested mapping to its own key template.
+       Used by apply_key_template().'''
+    key_template = (update_dictionary, frozenset(update_dictionary.keys()), {})
+    stack = [key_template]
+    while stack:
+        dictionary, _, children = stack.pop()
+        for key, value in dictionary.items():
+            if isinstance(value, collections.abc.Mapping):
+                children[key] = (value, frozenset(value.keys()), {})
+                stack.append(children[key])
+    return key_template
+
+
+def apply_key_template(original_dictionary, key_template):
+    '''Add the keys of a key template missing from original_dictionary, level by level.
+       Mappings along the way are copied, so original_dictionary is not modified.'''
+    result_dictionary = dict(original_dictionary)
+    stack = [(result_dictionary, key_template)]
+    while stack:
+        result_level, (update_level, update_keys, children) = stack.pop()
+        shared_keys = children.keys() & result_level.keys()
+        for key in update_keys - result_level.keys():
+            result_level[key] = update_level[key]
+        for key in shared_keys:
+            if isinstance(result_level[key], collections.abc.Mapping):
+                result_level[key] = dict(result_level[key])
+                stack.append((result_level[key], children[key]))
+    return result_dictionary
+
+
 def transform_add_keys(original_dictionary, update_dictionary):
     '''The dictionary returned is the original_dictionary
        plus any new default values from the update_dictionary.
-       Note: update_dictionary is modified by this function.'''
-    for key, value in original_dictionary.items():
-        if isinstance(value, collections.Mapping):
-            update_dictionary[key] = transform_add_keys(update_dictionary.get(key, {}), value)
-        else:
-            if key not in update_dictionary:
-                update_dictionary[key] = value
-    return update_dictionary
+       Neither dictionary is modified; the result shares unchanged values with them.'''
+    return apply_key_template(original_dictionary, make_key_template(update_dictionary))
+
+
+def transform_add_keys_batch(original_dictionaries, update_dictionary):
+    '''transform_add_keys() for many original dictionaries and one update_dictionary,
+       whose key sets are computed once.  Yields a result for each original dictionary.'''
+    key_template = make_key_template(update_dictionary)
+    for original_dictionary in original_dictionaries:
+        yield apply_key_template(original_dictionary, key_template)
 
 
 def transform_add_list_elements(original_dictionary, update_dictionary):
@@ -454,7 +2091,7 @@ def transform_add_list_elements(original_dictionary, update_dictionary):
        original_dictioary, add it to the original dictionary.
        Note: the original_directory is modified by this function.'''
     for key, value in update_dictionary.items():
-        if isinstance(value, collections.Mapping):
+        if isinstance(value, collections.abc.Mapping):
             original_dictionary[key] = transform_add_list_elements(original_dictionary.get(key, {}), value)
         elif isinstance(value, list):
             for list_element in value:
@@ -473,7 +2110,7 @@ def transform_add_list_unique_elements(original_dictionary, update_dictionary):
 
         # If a sub-dictionary, recurse.
 
-        if isinstance(value, collections.Mapping):
+        if isinstance(value, collections.abc.Mapping):
             original_dictionary[key] = transform_add_list_unique_elements(original_dictionary.get(key, {}), value)
 
         # If a list, add missing elements for unique compound keys.
@@ -481,10 +2118,31 @@ def transform_add_list_unique_elements(original_dictionary, update_dictionary):
         elif isinstance(value, list):
             if key not in original_dictionary:
                 original_dictionary[key] = []
+            original_list = original_dictionary[key]
+            extractors = list_element_unique_key_extractors.get(key, [])
+
+            # Without unique keys, fall back to whole-element comparison.
+
+            if not extractors:
+                original_length = len(original_list)
+                for list_element in value:
+                    if list_element not in original_list:
+                        original_list.append(list_element)
+                progress.merged(key, len(value), len(original_list) - original_length)
+                continue
+
+            # Index the "compound unique key" values once per list.
+            # An element equal to one in original_list always has a matching index entry.
+
+            indexes = [set(map(extractor, original_list)) for extractor in extractors]
+            original_length = len(original_list)
             for list_element in value:
-                if list_element not in original_dictionary[key]:
-                    if not keyed_needle_in_haystack(key, list_element, original_dictionary[key]):
-                        original_dictionary[key].append(list_element)
+                list_element_keys = [extractor(list_element) for extractor in extractors]
+                if not any(list_element_key in index for list_element_key, index in zip(list_element_keys, indexes)):
+                    original_list.append(list_element)
+                    for list_element_key, index in zip(list_element_keys, indexes):
+                        index.add(list_element_key)
+            progress.merged(key, len(value), len(original_list) - original_length)
 
         # Else fill in any missing keys.  Do not over-write values.
 
@@ -493,6 +2151,160 @@ def transform_add_list_unique_elements(original_dictionary, update_dictionary):
                 original_dictionary[key] = value
     return original_dictionary
 
+
+def transform_three_way_merge(original_dictionary, base_dictionary, update_dictionary, conflicts=None):
+    '''Apply the changes from base_dictionary to update_dictionary onto the original_dictionary.
+       Only what changed between base and update is examined in the original_dictionary.
+       Changes that collide with the original_dictionary are not applied;
+       they are appended to the "conflicts" list, if given.
+       Note: the original_directory is modified by this function.'''
+    if conflicts is None:
+        conflicts = []
+    delta = dictionary_delta(base_dictionary, update_dictionary)
+    return apply_dictionary_delta(original_dictionary, delta, [], conflicts)
+
+# -----------------------------------------------------------------------------
+# batch_* functions
+#   Common function signature: result_dictionary = batch_XXX(input_dictionary, shared_dictionary)
+# -----------------------------------------------------------------------------
+
+# The shared dictionary given to batch_* functions.  Set once per worker process.
+
+batch_shared = {}
+
+
+def batch_json_add_keys(input_dictionary, shared_dictionary):
+    '''json-add-keys for one file of a batch.  The key template is made once per worker.'''
+    if "key_template" not in batch_shared:
+        batch_shared["key_template"] = make_key_template(shared_dictionary)
+    return apply_key_template(input_dictionary, batch_shared["key_template"])
+
+
+def batch_json_add_list_elements(input_dictionary, shared_dictionary):
+    '''json-add-list-elements for one file of a batch.'''
+    return transform_add_list_elements(input_dictionary, shared_dictionary)
+
+
+def batch_json_difference(input_dictionary, shared_dictionary):
+    '''json-difference for one file of a batch.'''
+    return dictionary_difference(input_dictionary, shared_dictionary)
+
+
+def batch_json_pretty_print(input_dictionary, shared_dictionary):
+    '''json-pretty-print for one file of a batch.'''
+    normalize_json_list_ordering_for_printing(input_dictionary)
+    return input_dictionary
+
+
+# Map of subcommand to the batch_* function that performs it on one file.
+
+batch_functions = {
+    "json-add-keys": batch_json_add_keys,
+    "json-add-list-elements": batch_json_add_list_elements,
+    "json-difference": batch_json_difference,
+    "json-pretty-print": batch_json_pretty_print,
+}
+
+
+def is_batch_input(pathname):
+    '''Determine if pathname names many files: a directory or a glob pattern.'''
+    if os.path.isfile(pathname):
+        return False
+    return os.path.isdir(pathname) or any(character in pathname for character in "*?[")
+
+
+def batch_input_files(pathname):
+    '''Return a sorted list of (input_filename, relative_filename) for a directory
+       or glob pattern.  Directories are searched recursively for *.json files,
+       which may be compressed (*.json.gz, *.json.xz, *.json.zst).
+       Relative filenames are relative to the directory, or to the part of
+       the glob pattern before the first wildcard.'''
+    import glob
+    if os.path.isdir(pathname):
+        root_directory = pathname
+        filenames = []
+        for extension in [""] + [extension for _, extension, _ in compressed_file_types]:
+            filenames += glob.glob(os.path.join(glob.escape(pathname), "**", "*.json{0}".format(extension)), recursive=True)
+    else:
+        first_wildcard = min((pathname.index(character) for character in "*?[" if character in pathname), default=len(pathname))
+        root_directory = os.path.dirname(pathname[:first_wildcard])
+        filenames = glob.glob(pathname, recursive=True)
+    return [(filename, os.path.relpath(filename, root_directory or ".")) for filename in sorted(filenames) if os.path.isfile(filename)]
+
+
+def batch_initializer(shared_dictionary):
+    '''Give a worker process the shared dictionary.'''
+    batch_shared.clear()
+    batch_shared["dictionary"] = shared_dictionary
+
+
+def batch_file(subcommand, input_filename, output_filename):
+    '''Apply the batch_* function of a subcommand to one file.  Returns an error message or None.'''
+    try:
+        with open_compressed(input_filename) as input_file:
+            input_dictionary = json.load(input_file)
+        result_dictionary = batch_functions[subcommand](input_dictionary, batch_shared.get("dictionary"))
+        output_directory = os.path.dirname(output_filename)
+        if output_directory and not os.path.exists(output_directory):
+            os.makedirs(output_directory, exist_ok=True)
+        with open_compressed(output_filename, "w") as output_file:
+            json.dump(result_dictionary, output_file, sort_keys=True, indent=4)
+    except Exception as err:
+        return "{0}: {1}".format(input_filename, err)
+    return None
+
+
+def run_batch(args, input_pathname, shared_filename=None):
+    '''Run a subcommand over every file named by input_pathname, a directory or glob.
+       Output files mirror the input files under args.output_directory.
+       The shared file, if any, is parsed once and given to every worker.'''
+    import concurrent.futures
+
+    # Output files go in --output-dir.  A single --output-file cannot hold them.
+
+    if args.output_filename:
+        logging.error("Error: --output-file cannot be used with many input files. Use --output-dir.")
+        sys.exit(1)
+
+    output_directory = args.output_directory or "migrate-{0}-{1}".format(args.subcommand, int(time.time()))
+
+    # Find input files.
+
+    input_files = batch_input_files(input_pathname)
+    if not input_files:
+        logging.error("Error: {0} does not match any files".format(input_pathname))
+        sys.exit(1)
+
+    # Load the shared JSON once.
+
+    shared_dictionary = None
+    if shared_filename:
+        with open_compressed(shared_filename) as shared_file:
+            shared_dictionary = json.load(shared_file)
+
+    # Process files.
+
+    jobs = [(input_filename, os.path.join(output_directory, relative_filename)) for input_filename, relative_filename in input_files]
+    workers = min(args.workers or os.cpu_count() or 1, len(jobs))
+    if workers == 1:
+        batch_initializer(shared_dictionary)
+        errors = [batch_file(args.subcommand, input_filename, output_filename) for input_filename, output_filename in jobs]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=batch_initializer, initargs=(shared_dictionary,)) as executor:
+            errors = list(executor.map(batch_file, [args.subcommand] * len(jobs), *zip(*jobs)))
+
+    # Log results.
+
+    for (input_filename, output_filename), error in zip(jobs, errors):
+        if error:
+            logging.error("Error: {0}".format(error))
+        else:
+            logging.info("make-file: {0}".format(output_filename))
+
+    logging.info(exit_template.format(args.subcommand, output_directory))
+    if any(errors):
+        sys.exit(1)
+
 # -----------------------------------------------------------------------------
 # do_* functions
 #   Common function signature: do_XXX(args)
@@ -530,12 +2342,12 @@ def do_add_dscr_etype(args):
 
     # Load the existing configuration.
 
-    with open(existing_filename) as existing_file:
+    with open_compressed(existing_filename) as existing_file:
         existing_dictionary = json.load(existing_file)
 
     # Load the configuration template.
 
-    with open(template_filename) as template_file:
+    with open_compressed(template_filename) as template_file:
         template_dictionary = json.load(template_file)
 
     # Do the transformation.
@@ -544,7 +2356,7 @@ def do_add_dscr_etype(args):
 
     # Write output.
 
-    with open(output_filename, "w") as output_file:
+    with open_compressed(output_filename, "w") as output_file:
         json.dump(result_dictionary, output_file, sort_keys=True, indent=4)
 
     # Epilog.
@@ -569,6 +2381,15 @@ def do_json_add_keys(args):
     template_filename = args.template_filename
     output_filename = args.output_filename or "migrate-json-add-keys-{0}.json".format(int(time.time()))
 
+    # Process many files.
+
+    if is_batch_input(existing_filename):
+        if not os.path.isfile(template_filename):
+            logging.error("Error: --template-file {0} does not exist".format(template_filename))
+            sys.exit(1)
+        run_batch(args, existing_filename, template_filename)
+        return
+
     # Verify existence of files.
 
     if not os.path.isfile(existing_filename):
@@ -581,12 +2402,12 @@ def do_json_add_keys(args):
 
     # Load the existing JSON.
 
-    with open(existing_filename) as existing_file:
+    with open_compressed(existing_filename) as existing_file:
         existing_dictionary = json.load(existing_file)
 
     # Load the JSON template.
 
-    with open(template_filename) as template_file:
+    with open_compressed(template_filename) as template_file:
         template_dictionary = json.load(template_file)
 
     # Do the transformation.
@@ -595,7 +2416,7 @@ def do_json_add_keys(args):
 
     # Write output.
 
-    with open(output_filename, "w") as output_file:
+    with open_compressed(output_filename, "w") as output_file:
         json.dump(result_dictionary, output_file, sort_keys=True, indent=4)
 
     # Epilog.
@@ -620,6 +2441,15 @@ def do_json_add_list_elements(args):
     template_filename = args.template_filename
     output_filename = args.output_filename or "migrate-json-add-list-elements-{0}.json".format(int(time.time()))
 
+    # Process many files.
+
+    if is_batch_input(existing_filename):
+        if not os.path.isfile(template_filename):
+            logging.error("Error: --template-file {0} does not exist".format(template_filename))
+            sys.exit(1)
+        run_batch(args, existing_filename, template_filename)
+        return
+
     # Verify existence of files.
 
     if not os.path.isfile(existing_filename):
@@ -632,12 +2462,12 @@ def do_json_add_list_elements(args):
 
     # Load the existing JSON.
 
-    with open(existing_filename) as existing_file:
+    with open_compressed(existing_filename) as existing_file:
         existing_dictionary = json.load(existing_file)
 
     # Load the JSON template.
 
-    with open(template_filename) as template_file:
+    with open_compressed(template_filename) as template_file:
         template_dictionary = json.load(template_file)
 
     # Do the transformation.
@@ -646,7 +2476,7 @@ def do_json_add_list_elements(args):
 
     # Write output.
 
-    with open(output_filename, "w") as output_file:
+    with open_compressed(output_filename, "w") as output_file:
         json.dump(result_dictionary, output_file, sort_keys=True, indent=4)
 
     # Epilog.
@@ -671,6 +2501,18 @@ def do_json_difference(args):
     subtrahend_filename = args.subtrahend_filename
     output_filename = args.output_filename or "migrate-json-difference-{0}.json".format(int(time.time()))
 
+    # Process many files.
+
+    if is_batch_input(minuend_filename):
+        if args.out_of_core:
+            logging.error("Error: --out-of-core cannot be used with many --minuend files.")
+            sys.exit(1)
+        if not os.path.isfile(subtrahend_filename):
+            logging.error("Error: --subtrahend {0} does not exist".format(subtrahend_filename))
+            sys.exit(1)
+        run_batch(args, minuend_filename, subtrahend_filename)
+        return
+
     # Verify existence of file.
 
     if not os.path.isfile(minuend_filename):
@@ -681,21 +2523,28 @@ def do_json_difference(args):
         logging.error("Error: -subtrahend {0} does not exist".format(subtrahend_filename))
         sys.exit(1)
 
-    # Load the JSON files.
+    # Calculate difference without loading the files into memory.
 
-    with open(minuend_filename) as minuend_file:
-        minuend_dictionary = json.load(minuend_file)
+    if args.out_of_core:
+        result_dictionary = out_of_core_dictionary_difference(minuend_filename, subtrahend_filename, args.temporary_directory)
 
-    with open(subtrahend_filename) as subtrahend_file:
-        subtrahend_dictionary = json.load(subtrahend_file)
+    else:
 
-    # Calculate difference.
+        # Load the JSON files.
 
-    result_dictionary = dictionary_difference(minuend_dictionary, subtrahend_dictionary)
+        with open_compressed(minuend_filename) as minuend_file:
+            minuend_dictionary = json.load(minuend_file)
+
+        with open_compressed(subtrahend_filename) as subtrahend_file:
+            subtrahend_dictionary = json.load(subtrahend_file)
+
+        # Calculate difference.
+
+        result_dictionary = dictionary_difference(minuend_dictionary, subtrahend_dictionary)
 
     # Write the output JSON file.
 
-    with open(output_filename, "w") as output_file:
+    with open_compressed(output_filename, "w") as output_file:
         json.dump(result_dictionary, output_file, sort_keys=True, indent=4)
 
     # Epilog.
@@ -710,7 +2559,7 @@ def normalize_json_list_ordering_for_printing(jsondoc):
     '''Alters a recursive json document by re-ording lists to a standard order '''
     for key, value in jsondoc.items():
         # Handle maps.
-        if isinstance(value, collections.Mapping):
+        if isinstance(value, collections.abc.Mapping):
             normalize_json_list_ordering_for_printing(value)
         # Handle lists.
         elif isinstance(value, list):
@@ -730,6 +2579,12 @@ def do_json_pretty_print(args):
     input_filename = args.input_filename
     output_filename = args.output_filename or "migrate-json-pretty-print-{0}.json".format(int(time.time()))
 
+    # Process many files.
+
+    if is_batch_input(input_filename):
+        run_batch(args, input_filename)
+        return
+
     # Verify existence of file.
 
     if not os.path.isfile(input_filename):
@@ -738,7 +2593,7 @@ def do_json_pretty_print(args):
 
     # Load the JSON file.
 
-    with open(input_filename) as input_file:
+    with open_compressed(input_filename) as input_file:
         input_dictionary = json.load(input_file)
 
     # Normalize the ordering of JSON lists.
@@ -747,7 +2602,7 @@ def do_json_pretty_print(args):
 
     # Write the output JSON file.
 
-    with open(output_filename, "w") as output_file:
+    with open_compressed(output_filename, "w") as output_file:
         json.dump(input_dictionary, output_file, sort_keys=True, indent=4)
 
     # Epilog.
@@ -768,12 +2623,14 @@ def do_migrate_g2config(args):
     # Prolog.
 
     logging.info(entry_template.format(args))
+    progress.start(args.progress, args.progress_interval)
 
     # Parse command line arguments.
 
     existing_filename = args.existing_filename
     template_filename = args.template_filename
     g2config_blacklist_filename = args.g2config_blacklist_filename
+    base_filename = args.base_filename
     output_filename = args.output_filename or "migrate-g2config-{0}.json".format(int(time.time()))
 
     # Verify existence of files.
@@ -786,19 +2643,54 @@ def do_migrate_g2config(args):
         logging.error("Error: --template-g2config-file {0} does not exist".format(template_filename))
         sys.exit(1)
 
+    if base_filename and not os.path.isfile(base_filename):
+        logging.error("Error: --base-g2config-file {0} does not exist".format(base_filename))
+        sys.exit(1)
+
+    # Load the unique key schema.
+
+    if args.g2config_unique_keys_filename:
+        load_list_element_unique_keys(args.g2config_unique_keys_filename)
+
+    # Return a cached result, if one exists.
+    # Three-way merges also report conflicts, so they are not cached.
+
+    use_cache = not args.no_cache and not base_filename
+    if use_cache:
+        cache_key = g2config_cache_key(existing_filename, template_filename, g2config_blacklist_filename, compression_of(output_filename, "w"))
+        if cache_get(args.cache_directory, cache_key, output_filename):
+            logging.info("cache-hit: {0}".format(cache_key))
+            if args.validate and validate_g2config_file(output_filename):
+                sys.exit(1)
+            logging.info(exit_template.format(args.subcommand, output_filename))
+            return
+
     # Load the existing configuration.
 
-    with open(existing_filename) as existing_file:
+    with open_compressed(existing_filename) as existing_file:
         existing_dictionary = json.load(existing_file)
 
     # Load the new configuration template.
 
-    with open(template_filename) as template_file:
+    with open_compressed(template_filename) as template_file:
         template_dictionary = json.load(template_file)
 
     # Do the transformation.
 
-    result_dictionary = transform_add_list_unique_elements(existing_dictionary, template_dictionary)
+    if base_filename:
+        with open_compressed(base_filename) as base_file:
+            base_dictionary = json.load(base_file)
+        conflicts = []
+        result_dictionary = transform_three_way_merge(existing_dictionary, base_dictionary, template_dictionary, conflicts)
+        for conflict in conflicts:
+            logging.warning("conflict: {0}".format(json.dumps(conflict, sort_keys=True)))
+        if args.conflicts_filename:
+            with open_compressed(args.conflicts_filename, "w") as conflicts_file:
+                json.dump(conflicts, conflicts_file, sort_keys=True, indent=4)
+            logging.info("make-file: {0}".format(args.conflicts_filename))
+    else:
+        progress.add_totals(rows=count_list_elements(template_dictionary))
+        result_dictionary = transform_add_list_unique_elements(existing_dictionary, template_dictionary)
 
     # Perform blacklist operation.
 
@@ -809,18 +2701,157 @@ def do_migrate_g2config(args):
 
     # Write output.
 
-    with open(output_filename, "w") as output_file:
+    with open_compressed(output_filename, "w") as output_file:
         json.dump(result_dictionary, output_file, sort_keys=True, indent=4)
 
+    # Save result in the cache.
+
+    if use_cache:
+        cache_put(args.cache_directory, cache_key, output_filename, args.cache_max_bytes)
+
+    progress.finish()
+
+    # Check references.
+
+    if args.validate and validate_g2config_file(output_filename):
+        sys.exit(1)
+
     # Epilog.
 
     logging.info(exit_template.format(args.subcommand, output_filename))
 
+# -----------------------------------------------------------------------------
+# validate-g2config subcommand
+# -----------------------------------------------------------------------------
+
+
+def do_validate_g2config(args):
+    '''Check that references between g2config.json lists, such as
+       CFG_FBOM.FTYPE_ID to CFG_FTYPE, refer to list elements that exist.'''
+
+    # Prolog.
+
+    logging.info(entry_template.format(args))
+
+    # Verify existence of file.
+
+    if not os.path.isfile(args.input_filename):
+        logging.error("Error: --input-file {0} does not exist".format(args.input_filename))
+        sys.exit(1)
+
+    # Load the unique key schema.
+
+    if args.g2config_unique_keys_filename:
+        load_list_element_unique_keys(args.g2config_unique_keys_filename)
+
+    # Check references.
+
+    if validate_g2config_file(args.input_filename, args.output_filename):
+        sys.exit(1)
+
+    # Epilog.
+
+    logging.info(exit_template.format(args.subcommand, args.output_filename or args.input_filename))
+
 # -----------------------------------------------------------------------------
 # migrate-senzing-dir
 # -----------------------------------------------------------------------------
 
 
+def apply_proposal_archive(proposal_filename, new_directory):
+    '''Extract a proposal archive from ProposalArchive in one sequential pass,
+       hashing files as they are written.  Returns a dictionary of files "missing"
+       from, or "changed" compared to, the index member.
+       The index is the last member, so files are extracted into a staging directory
+       next to new_directory and moved into new_directory only if there are no problems.
+       Otherwise, new_directory is not modified.'''
+    import shutil
+    import tempfile
+
+    staging_directory = tempfile.mkdtemp(prefix=".senzing-proposal-", dir=os.path.dirname(os.path.abspath(new_directory)))
+    try:
+        files, result = extract_proposal_archive(proposal_filename, staging_directory)
+        if any(result.values()):
+            return result
+
+        # Move files into place.
+
+        for name in files:
+            filename = os.path.join(new_directory, os.path.normpath(name))
+            ensure_directory(os.path.dirname(filename))
+            os.replace(os.path.join(staging_directory, os.path.normpath(name)), filename)
+            logging.info("extract-file: {0}".format(filename))
+        return result
+    finally:
+        shutil.rmtree(staging_directory, ignore_errors=True)
+
+
+def extract_proposal_archive(proposal_filename, staging_directory):
+    '''Extract a proposal archive into staging_directory.  Returns a dictionary of
+       member names to SHA-256 digests, and the result for apply_proposal_archive().'''
+    import hashlib
+    import tarfile
+
+    if compression_of(proposal_filename) == "zstd":
+        input_file = import_zstd().open(proposal_filename, "rb")
+    else:
+        input_file = open(proposal_filename, "rb")
+
+    files = {}
+    index = None
+    with input_file, tarfile.open(fileobj=input_file, mode="r|*") as tar:
+        for member in tar:
+            name = os.path.normpath(member.name)
+            if not member.isfile() or os.path.isabs(name) or name.split(os.sep)[0] == os.pardir:
+                logging.error("Error: {0} is not a proposal archive. Unexpected member: {1}".format(proposal_filename, member.name))
+                sys.exit(1)
+            member_file = tar.extractfile(member)
+            if member.name == proposal_index_member:
+                index = json.load(member_file)
+                continue
+
+            # Write the file.
+
+            filename = os.path.join(staging_directory, name)
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            digest = hashlib.sha256()
+            with open(filename, "wb") as output_file:
+                for block in iter(lambda: member_file.read(file_copy_block_size), b""):
+                    digest.update(block)
+                    output_file.write(block)
+            os.chmod(filename, member.mode)
+            os.utime(filename, (member.mtime, member.mtime))
+            files[member.name] = digest.hexdigest()
+
+    if index is None:
+        logging.error("Error: {0} has no {1}".format(proposal_filename, proposal_index_member))
+        sys.exit(1)
+    return files, {
+        "missing": sorted(name for name in index["files"] if name not in files),
+        "changed": sorted(name for name, expected in index["files"].items() if name in files and files[name] != expected["sha256"]),
+    }
+
+
+def start_proposal(proposed_directory, proposal_format, proposal_filename=None):
+    '''Create the proposed directory, or open the proposal archive for a
+       proposal_format of "tar" or "tar.zst".  Returns the output pathname.'''
+    if proposal_format == "dir":
+        if not os.path.exists(proposed_directory):
+            os.makedirs(proposed_directory)
+        return proposed_directory
+    proposal_filename = proposal_filename or "{0}.{1}".format(proposed_directory, proposal_format)
+    proposal_archive.open(proposed_directory, proposal_filename, proposal_format)
+    return proposal_filename
+
+
+def finish_proposal(proposed_directory, manifest_filename=None):
+    '''Close the proposal archive, or write the manifest of the proposed directory.'''
+    if proposal_archive.is_open():
+        proposal_archive.close()
+    else:
+        write_proposal_manifest(proposed_directory, manifest_filename or manifest_filename_default.format(proposed_directory))
+
+
 def do_migrate_senzing_dir(args):
     '''Create a 'proposed' directory of changes to apply to the new Senzing directory.
        Note: This does not modify the old nor the new senzing directory.  Rather it
@@ -828,6 +2859,29 @@ def do_migrate_senzing_dir(args):
        applied to the new senzing directory.'''
 
     logging.info(entry_template.format(args))
+    progress.start(args.progress, args.progress_interval)
+
+    # Load the unique key schema.
+
+    if args.g2config_unique_keys_filename:
+        load_list_element_unique_keys(args.g2config_unique_keys_filename)
+
+    # Apply a plan made by an earlier --plan.
+
+    if args.apply_plan_filename:
+        if not os.path.isfile(args.apply_plan_filename):
+            logging.error("Error: --apply-plan {0} does not exist".format(args.apply_plan_filename))
+            sys.exit(1)
+        with open(args.apply_plan_filename) as plan_file:
+            plan = json.load(plan_file)
+        proposal_output = start_proposal(plan["proposed_senzing_directory"], args.proposal_format, args.proposal_filename)
+        if proposal_archive.is_open():
+            blacklist.append("{0}/g2/python/g2config.json".format(plan["old_senzing_directory"]))
+        apply_migration_plan(plan)
+        finish_proposal(plan["proposed_senzing_directory"], args.manifest_filename)
+        progress.finish()
+        logging.info(exit_template.format(args.subcommand, proposal_output))
+        return
 
     # Parse command line arguments.
 
@@ -838,62 +2892,325 @@ def do_migrate_senzing_dir(args):
 
     # Verify existence of directories.
 
-    if not os.path.isdir(old_directory):
+    if not old_directory or not os.path.isdir(old_directory):
         logging.error("Error: --old-senzing-dir {0} does not exist".format(old_directory))
         sys.exit(1)
 
-    if not os.path.isdir(new_directory):
+    if not new_directory or not os.path.isdir(new_directory):
         logging.error("Error: --new-senzing-dir {0} does not exist".format(new_directory))
         sys.exit(1)
 
-    if not os.path.exists(proposed_directory):
-        os.makedirs(proposed_directory)
+    # Populate blacklist.
+
+    for blacklist_item in blacklist_template:
+        blacklist.append(blacklist_item.format(old_directory))
+
+    # Populate immutable files.
+
+    for immutable_file in args.immutable_files:
+        immutable_files.append("{0}/{1}".format(old_directory, immutable_file))
+
+    # Make a plan, using only file metadata, instead of a proposal.
+
+    if args.plan_filename:
+        plan = make_migration_plan(old_directory, new_directory, proposed_directory, g2config_blacklist_filename, args.throughput)
+        with open(args.plan_filename, "w") as plan_file:
+            json.dump(plan, plan_file, sort_keys=True, indent=4)
+        logging.info("plan: {0} files, {1} bytes, {2} to verify, {3} blacklisted, {4} directories, about {5:.1f} seconds".format(
+            len(plan["copy"]), plan["total_bytes"], sum(1 for entry in plan["copy"] if "verify" in entry),
+            len(plan["blacklisted"]), len(plan["directories"]), plan["estimated_seconds"]))
+        logging.info(exit_template.format(args.subcommand, args.plan_filename))
+        return
+
+    proposal_output = start_proposal(proposed_directory, args.proposal_format, args.proposal_filename)
+
+    # An archive member cannot be replaced, so the old g2/python/g2config.json is not
+    # copied into a proposal archive.  propose_g2_python_g2config_json() adds the new one.
+
+    if proposal_archive.is_open():
+        blacklist.append("{0}/g2/python/g2config.json".format(old_directory))
 
     # Log versions.
 
     log_file("{0}/g2/data/g2BuildVersion.txt".format(old_directory), "old-version")
     log_file("{0}/g2/data/g2BuildVersion.txt".format(new_directory), "new-version")
 
-    # Log differences.
+    if args.sqlite_table_diff:
+        log_sqlite_differences(diff_sqlite_files_list, old_directory, new_directory)
 
-    log_directory_list = [["{0}", "{1}", "{2}"]]
-    log_directory_differences(log_directory_list, old_directory, new_directory, proposed_directory)
+    # Log differences and make directory, file, and SQLite database proposals.
 
-    # Populate blacklist.
+    if args.engine == "async":
+        run_async_migrate_senzing_dir(old_directory, new_directory, proposed_directory, args.concurrency)
 
-    for blacklist_item in blacklist_template:
-        blacklist.append(blacklist_item.format(old_directory))
+        # File-specific proposals.
 
-    # Directory proposals.
+        propose_g2_python_g2config_json(old_directory, new_directory, proposed_directory, g2config_blacklist_filename)
+    else:
 
-    diff_directories_list = [
-        ["{0}/g2/python", "{1}/g2/python", "{2}/g2/python"]
-    ]
+        # Log differences.
 
-    propose_diff_and_copy_directories_from_old(diff_directories_list, old_directory, new_directory, proposed_directory)
+        log_directory_list = [["{0}", "{1}", "{2}"]]
+        log_directory_differences(log_directory_list, old_directory, new_directory, proposed_directory)
 
-    # File proposals.
+        # Decide every directory, file, and SQLite database copy first, so progress
+        # knows the totals, then copy and make file-specific proposals.
 
-    diff_files_list = [
-        ["{0}/g2/setupEnv", "{1}/g2/setupEnv", "{2}/g2/setupEnv"],
-        ["{0}/g2/data/g2.lic", "{1}/g2/data/g2.lic", "{2}/g2/data/g2.lic"],
-        ["{0}/g2/sqldb/G2C.db", "{0}/g2/data/G2C.db", "{2}/g2/sqldb/G2C.db"]
-    ]
+        plan = make_migration_plan(old_directory, new_directory, proposed_directory, g2config_blacklist_filename, throughput=False, compare_contents=True)
+        apply_migration_plan(plan)
+
+    # Manifest of the proposal, for verify-proposal.
+
+    finish_proposal(proposed_directory, args.manifest_filename)
+
+    progress.finish()
+
+    # Epilog.
+
+    logging.info(exit_template.format(args.subcommand, proposal_output))
+
+
+def do_apply_proposal(args):
+    '''Extract a proposal archive made by migrate-senzing-dir --proposal-format tar or tar.zst.'''
+
+    logging.info(entry_template.format(args))
+
+    # Verify existence of files.
+
+    if not os.path.isfile(args.proposal_filename):
+        logging.error("Error: --proposal-file {0} does not exist".format(args.proposal_filename))
+        sys.exit(1)
+
+    if not os.path.isdir(args.new_senzing_directory):
+        logging.error("Error: --new-senzing-dir {0} does not exist".format(args.new_senzing_directory))
+        sys.exit(1)
 
-    propose_diff_and_copy_files_from_old(diff_files_list, old_directory, new_directory, proposed_directory)
+    # Extract files.
 
-    # File-specific proposals.
+    result = apply_proposal_archive(args.proposal_filename, args.new_senzing_directory)
 
-    propose_g2_python_g2config_json(old_directory, new_directory, proposed_directory, g2config_blacklist_filename)
+    # Report problems.
+
+    for problem, names in sorted(result.items()):
+        for name in names:
+            logging.error("{0}: {1}".format(problem, name))
+    if any(result.values()):
+        logging.error("Error: {0} was not applied. --new-senzing-dir {1} is unchanged.".format(args.proposal_filename, args.new_senzing_directory))
+        sys.exit(1)
 
     # Epilog.
 
+    logging.info(exit_template.format(args.subcommand, args.new_senzing_directory))
+
+
+def do_verify_proposal(args):
+    '''Check that a proposal has not changed since migrate-senzing-dir wrote its manifest.'''
+
+    logging.info(entry_template.format(args))
+
+    # Parse command line arguments.
+
+    proposed_directory = args.proposed_senzing_directory
+    manifest_filename = args.manifest_filename or manifest_filename_default.format(proposed_directory)
+
+    # Verify existence of files.
+
+    if not os.path.isdir(proposed_directory):
+        logging.error("Error: --proposed-senzing-dir {0} does not exist".format(proposed_directory))
+        sys.exit(1)
+
+    if not os.path.isfile(manifest_filename):
+        logging.error("Error: --manifest-file {0} does not exist".format(manifest_filename))
+        sys.exit(1)
+
+    # Check files.
+
+    with open(manifest_filename) as manifest_file:
+        manifest = json.load(manifest_file)
+    result = verify_proposal(proposed_directory, manifest, args.workers)
+
+    # Report problems.
+
+    for problem, relative_filenames in sorted(result.items()):
+        for relative_filename in relative_filenames:
+            logging.error("{0}: {1}".format(problem, os.path.join(proposed_directory, relative_filename)))
+    if any(result.values()):
+        sys.exit(1)
+
+    # Epilog.
+
+    logging.info("verified: {0} files".format(len(manifest["files"])))
     logging.info(exit_template.format(args.subcommand, proposed_directory))
 
+# -----------------------------------------------------------------------------
+# serve subcommand
+# -----------------------------------------------------------------------------
+
+# Operations available to "serve".  For each operation: the function,
+# the names of its parameters, and the parameters it modifies.
+
+served_operations = {
+    "dictionary_difference": (dictionary_difference, ["minuend", "subtrahend"], []),
+    "transform_add_dsrc_etype": (transform_add_dsrc_etype, ["original", "update"], []),
+    "transform_add_keys": (transform_add_keys, ["original", "update"], []),
+    "transform_add_list_elements": (transform_add_list_elements, ["original", "update"], ["original"]),
+    "transform_add_list_unique_elements": (transform_add_list_unique_elements, ["original", "update"], ["original"]),
+}
+
+
+def load_json_file_cached(filename, json_file_cache):
+    '''Return the parsed contents of a JSON file.  Files are re-parsed only
+       when their size or modification time changes.'''
+    stat = os.stat(filename)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    cached = json_file_cache.get(filename)
+    if cached is None or cached[0] != signature:
+        with open_compressed(filename) as input_file:
+            cached = (signature, json.load(input_file))
+        json_file_cache[filename] = cached
+        logging.info("serve-load: {0}".format(filename))
+    return cached[1]
+
+
+def serve_request(operation, request, json_file_cache):
+    '''Perform an operation for "serve".  Each parameter is given in the request
+       either as a JSON value, "name", or as a file pathname, "name_file".
+       Parsed files are kept in json_file_cache.  Returns the result of the operation.
+       Raises KeyError for an unknown operation and ValueError for a missing parameter.'''
+    import copy
+    if operation not in served_operations:
+        raise KeyError("Unknown operation: {0}".format(operation))
+    function, parameters, modified_parameters = served_operations[operation]
+    arguments = []
+    for parameter in parameters:
+        if parameter in request:
+            argument = request[parameter]
+        elif "{0}_file".format(parameter) in request:
+            argument = load_json_file_cached(request["{0}_file".format(parameter)], json_file_cache)
+
+            # Never let an operation modify a cached document.
+
+            if parameter in modified_parameters:
+                argument = copy.deepcopy(argument)
+        else:
+            raise ValueError("Missing parameter: {0} or {0}_file".format(parameter))
+        arguments.append(argument)
+    return function(*arguments)
+
+
+def make_server(host, port, unix_socket):
+    '''Create the "serve" HTTP server.  If unix_socket, listen on a Unix domain socket.'''
+    import http.server
+    import socketserver
+
+    class ServeRequestHandler(http.server.BaseHTTPRequestHandler):
+        '''Handle "POST /<operation>" requests with a JSON body.'''
+
+        def do_POST(self):
+            operation = self.path.strip("/")
+            try:
+                content_length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(content_length) or b"{}")
+                if operation not in served_operations:
+                    response = {"error": "Unknown operation: {0}".format(operation)}
+                    status = 404
+                elif not isinstance(request, dict):
+                    response = {"error": "Request must be a JSON object"}
+                    status = 400
+                else:
+                    response = {"result": serve_request(operation, request, self.server.json_file_cache)}
+                    status = 200
+            except (ValueError, OSError) as err:
+                response = {"error": str(err)}
+                status = 400
+
+            # Any other error comes from the operation itself.  Always answer the client.
+
+            except Exception as err:
+                logging.error("serve: {0} failed: {1!r}".format(operation, err))
+                response = {"error": str(err)}
+                status = 500
+            body = json.dumps(response).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def address_string(self):
+
+            # Unix domain sockets have no client address.
+
+            return self.client_address[0] if self.client_address else "unix-socket"
+
+        def log_message(self, format, *args):
+            logging.debug("serve: {0} {1}".format(self.address_string(), format % args))
+
+    class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        '''An HTTP server listening on a Unix domain socket.'''
+        daemon_threads = True
+
+    # Create server.
+
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = UnixHTTPServer(unix_socket, ServeRequestHandler)
+    else:
+        server = http.server.ThreadingHTTPServer((host, port), ServeRequestHandler)
+    server.json_file_cache = {}
+    return server
+
+
+def do_serve(args):
+    '''Serve transform_* and dictionary_difference operations until interrupted.
+       Template and blacklist files are parsed once and kept in memory.'''
+
+    # Prolog.
+
+    logging.info(entry_template.format(args))
+
+    # Load the unique key schema.
+
+    if args.g2config_unique_keys_filename:
+        load_list_element_unique_keys(args.g2config_unique_keys_filename)
+
+    # Serve requests.
+
+    server = make_server(args.host, args.port, args.unix_socket)
+    logging.info("serve: listening on {0}".format(args.unix_socket or "{0}:{1}".format(args.host, args.port)))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.remove(args.unix_socket)
+
+    # Epilog.
+
+    logging.info(exit_template.format(args.subcommand, args.unix_socket or args.port))
+
 # -----------------------------------------------------------------------------
 # Main
 # -----------------------------------------------------------------------------
 
+# Map of subcommand to the function that performs it.
+
+subcommand_functions = {
+    "add-dscr-etype": do_add_dscr_etype,
+    "apply-proposal": do_apply_proposal,
+    "json-add-keys": do_json_add_keys,
+    "json-add-list-elements": do_json_add_list_elements,
+    "json-difference": do_json_difference,
+    "json-pretty-print": do_json_pretty_print,
+    "migrate-g2config": do_migrate_g2config,
+    "migrate-senzing-dir": do_migrate_senzing_dir,
+    "serve": do_serve,
+    "validate-g2config": do_validate_g2config,
+    "verify-proposal": do_verify_proposal,
+}
 
 if __name__ == "__main__":
 
@@ -902,8 +3219,10 @@ if __name__ == "__main__":
     logging.basicConfig(format='%(asctime)s %(levelname)s: %(message)s', level=logging.DEBUG)
 
     # Parse the command line arguments.
+    # If the subcommand is known, build only its subparser.
 
-    parser = get_parser()
+    requested_subcommand = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] in subcommand_functions else None
+    parser = get_parser(requested_subcommand)
     args = parser.parse_args()
     subcommand = args.subcommand
 
@@ -913,10 +3232,6 @@ if __name__ == "__main__":
         parser.print_help()
         sys.exit(1)
 
-    # Transform subcommand from CLI parameter to function name string.
-
-    subcommand_function_name = "do_{0}".format(subcommand.replace('-', '_'))
-
-    # Tricky code for calling function based on string.
+    # Call the function for the subcommand.
 
-    globals()[subcommand_function_name](args)
+    subcommand_functions[subcommand](args)
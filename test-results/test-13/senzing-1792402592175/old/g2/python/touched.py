@@ -0,0 +1 @@
+touched
@@ -0,0 +1 @@
+old only
@@ -0,0 +1 @@
+# 8
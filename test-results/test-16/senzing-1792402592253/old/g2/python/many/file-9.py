@@ -0,0 +1 @@
+# 9
@@ -0,0 +1 @@
+print('old only')
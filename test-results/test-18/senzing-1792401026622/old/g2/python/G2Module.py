@@ -0,0 +1 @@
+blacklisted
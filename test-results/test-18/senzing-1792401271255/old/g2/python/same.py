@@ -0,0 +1 @@
+same
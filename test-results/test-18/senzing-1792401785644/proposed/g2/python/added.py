@@ -0,0 +1 @@
+added
@@ -1,11 +1,43 @@
 #! /usr/bin/env python
 
+import asyncio
+import filecmp
+import gzip
+import http.client
+import io
 import json
 import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tarfile
+import threading
 import time
 import unittest
+import unittest.mock
 
+import migrate
 from migrate import transform_add_list_unique_elements, transform_add_dsrc_etype, transform_add_keys, transform_add_list_elements
+from migrate import transform_add_keys_batch
+from migrate import load_list_element_unique_keys, set_list_element_unique_keys
+from migrate import files_equal
+from migrate import copy_sqlite_database, sqlite_database_difference
+from migrate import get_parser, do_migrate_g2config, cache_put
+from migrate import serve_request, make_server
+from migrate import do_json_difference, dictionary_difference
+from migrate import transform_three_way_merge
+from migrate import make_migration_plan, apply_migration_plan
+from migrate import new_migration_plan, plan_diff_and_copy_directories_from_old, copy_planned_files
+from migrate import async_propose_diff_and_copy_directories_from_old
+from migrate import scan_directory_diff
+from migrate import do_migrate_senzing_dir
+from migrate import progress
+from migrate import file_digest, verify_proposal
+from migrate import out_of_core_dictionary_difference, iter_json_stream, JsonStreamReader
+from migrate import open_compressed, compression_of
+from migrate import apply_proposal_archive, ProposalArchive
+from migrate import g2config_dangling_references
 
 # -----------------------------------------------------------------------------
 # Test_01 - test transform_add_list_unique_elements()
@@ -139,6 +171,44 @@ class Test_03(unittest.TestCase):
 
         self.assertDictEqual(result_dictionary, self.final_dictionary, "Dictionaries are not equal")
 
+    def test_transform_add_keys_02(self):
+
+        # Run test.  Inputs must not change, so the template can be reused.
+
+        original_json = json.dumps(self.original_dictionary, sort_keys=True)
+        template_json = json.dumps(self.template_dictionary, sort_keys=True)
+        results = list(transform_add_keys_batch([self.original_dictionary, self.original_dictionary], self.template_dictionary))
+
+        # Check results.
+
+        self.assertEqual(json.dumps(self.original_dictionary, sort_keys=True), original_json)
+        self.assertEqual(json.dumps(self.template_dictionary, sort_keys=True), template_json)
+        for result_dictionary in results:
+            self.assertDictEqual(result_dictionary, self.final_dictionary, "Dictionaries are not equal")
+
+    def test_transform_add_keys_03(self):
+
+        # Run test on nesting deeper than the recursion limit.
+
+        depth = sys.getrecursionlimit() * 2
+        original_dictionary = {}
+        template_dictionary = {}
+        original_level = original_dictionary
+        template_level = template_dictionary
+        for _ in range(depth):
+            original_level["next"] = {"kept": 1}
+            template_level["next"] = {"kept": 2, "added": 3}
+            original_level = original_level["next"]
+            template_level = template_level["next"]
+        result_dictionary = transform_add_keys(original_dictionary, template_dictionary)
+
+        # Check results.
+
+        result_level = result_dictionary
+        for _ in range(depth):
+            result_level = result_level["next"]
+            self.assertEqual((result_level["kept"], result_level["added"]), (1, 3))
+
 # -----------------------------------------------------------------------------
 # Test_04 - test transform_add_list_elements()
 # -----------------------------------------------------------------------------
@@ -183,6 +253,1233 @@ class Test_04(unittest.TestCase):
 
         self.assertDictEqual(result_dictionary, self.final_dictionary, "Dictionaries are not equal")
 
+# -----------------------------------------------------------------------------
+# Test_05 - test load_list_element_unique_keys()
+# -----------------------------------------------------------------------------
+
+
+class Test_05(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create input and output directories.
+
+        self.test_input_directory = "tests/test-05"
+        self.test_output_directory = "test-results/test-05"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def setUp(self):
+
+        # Save the built-in unique key schema.
+
+        self.saved_unique_keys = json.loads(json.dumps(migrate.list_element_unique_keys))
+
+        # Load dictionaries.
+
+        with open("tests/test-01/data/original.json") as original_file:
+            self.original_dictionary = json.load(original_file)
+        with open("tests/test-01/data/template.json") as template_file:
+            self.template_dictionary = json.load(template_file)
+        with open("tests/test-01/data/final.json") as final_file:
+            self.final_dictionary = json.load(final_file)
+
+    def tearDown(self):
+
+        # Restore the built-in unique key schema.
+
+        set_list_element_unique_keys(self.saved_unique_keys)
+
+    def test_load_list_element_unique_keys_01(self):
+
+        # Run test.
+
+        load_list_element_unique_keys("unique-keys/g2config-unique-keys-1.3.18278.json")
+        result_dictionary = transform_add_list_unique_elements(self.original_dictionary, self.template_dictionary)
+
+        # Check results.
+
+        self.assertDictEqual(migrate.list_element_unique_keys, self.saved_unique_keys, "Schemas are not equal")
+        self.assertDictEqual(result_dictionary, self.final_dictionary, "Dictionaries are not equal")
+
+    def test_load_list_element_unique_keys_02(self):
+
+        # Run test.
+
+        with self.assertRaises(SystemExit):
+            load_list_element_unique_keys("{0}/data/unique-keys-invalid.json".format(self.test_input_directory))
+
+        # Check results.
+
+        self.assertDictEqual(migrate.list_element_unique_keys, self.saved_unique_keys, "Schema was modified")
+
+# -----------------------------------------------------------------------------
+# Test_06 - test files_equal()
+# -----------------------------------------------------------------------------
+
+
+class Test_06(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-06"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def setUp(self):
+
+        # Create files larger than the head and tail samples.
+
+        self.contents = bytes(range(256)) * 2048
+        self.filenames = {}
+        changes = {
+            "same": self.contents,
+            "middle": self.contents[:len(self.contents) // 2] + b"x" + self.contents[len(self.contents) // 2 + 1:],
+            "short": self.contents[:-1],
+            "empty": b"",
+        }
+        for name, contents in changes.items():
+            self.filenames[name] = "{0}/{1}.bin".format(self.test_output_directory, name)
+            with open(self.filenames[name], "wb") as output_file:
+                output_file.write(contents)
+        self.filenames["original"] = "{0}/original.bin".format(self.test_output_directory)
+        with open(self.filenames["original"], "wb") as output_file:
+            output_file.write(self.contents)
+
+    def test_files_equal_01(self):
+
+        # Check results.
+
+        self.assertTrue(files_equal(self.filenames["original"], self.filenames["same"]))
+        self.assertTrue(files_equal(self.filenames["empty"], self.filenames["empty"]))
+        self.assertFalse(files_equal(self.filenames["original"], self.filenames["middle"]))
+        self.assertFalse(files_equal(self.filenames["original"], self.filenames["short"]))
+        self.assertFalse(files_equal(self.filenames["original"], self.filenames["empty"]))
+
+    def test_files_equal_02(self):
+
+        # Give differing files of the same size the same modification time.
+
+        stat = os.stat(self.filenames["original"])
+        os.utime(self.filenames["middle"], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        # Check results.
+
+        self.assertFalse(files_equal(self.filenames["original"], self.filenames["middle"]))
+        self.assertTrue(files_equal(self.filenames["original"], self.filenames["middle"], trust_mtime=True))
+
+# -----------------------------------------------------------------------------
+# Test_07 - test copy_sqlite_database() and sqlite_database_difference()
+# -----------------------------------------------------------------------------
+
+
+class Test_07(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-07"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def setUp(self):
+
+        # Create databases.
+
+        self.old_filename = "{0}/old.db".format(self.test_output_directory)
+        self.new_filename = "{0}/new.db".format(self.test_output_directory)
+        statements = {
+            self.old_filename: [
+                "CREATE TABLE SYS_CFG (CONFIG_DATA_ID INTEGER)",
+                "CREATE TABLE OLD_ONLY (ID INTEGER)",
+                "CREATE TABLE CHANGED (ID INTEGER)",
+                "INSERT INTO SYS_CFG VALUES (1)",
+                "INSERT INTO SYS_CFG VALUES (2)",
+            ],
+            self.new_filename: [
+                "CREATE TABLE SYS_CFG (CONFIG_DATA_ID INTEGER)",
+                "CREATE TABLE NEW_ONLY (ID INTEGER)",
+                "CREATE TABLE CHANGED (ID INTEGER, CODE TEXT)",
+                "INSERT INTO SYS_CFG VALUES (1)",
+            ],
+        }
+        for filename, filename_statements in statements.items():
+            if os.path.exists(filename):
+                os.remove(filename)
+            connection = sqlite3.connect(filename)
+            for statement in filename_statements:
+                connection.execute(statement)
+            connection.commit()
+            connection.close()
+
+    def test_sqlite_database_difference_01(self):
+
+        # Run test.
+
+        result = sqlite_database_difference(self.old_filename, self.new_filename)
+
+        # Check results.
+
+        self.assertEqual(result["old-only"], ["OLD_ONLY"])
+        self.assertEqual(result["new-only"], ["NEW_ONLY"])
+        self.assertEqual(result["schema-changed"], ["CHANGED"])
+        self.assertEqual(result["row-count-changed"], {"SYS_CFG": [2, 1]})
+
+    def test_copy_sqlite_database_01(self):
+
+        # Run test.
+
+        output_filename = "{0}/copy-{1}/G2C.db".format(self.test_output_directory, int(time.time() * 1000))
+        copy_sqlite_database(self.old_filename, output_filename)
+
+        # Check results.
+
+        result = sqlite_database_difference(self.old_filename, output_filename)
+        self.assertEqual(result, {"old-only": [], "new-only": [], "schema-changed": [], "row-count-changed": {}})
+
+# -----------------------------------------------------------------------------
+# Test_08 - test migrate-g2config result cache
+# -----------------------------------------------------------------------------
+
+
+class Test_08(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-08"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def setUp(self):
+
+        # Use an empty cache.
+
+        self.cache_directory = "{0}/cache-{1}".format(self.test_output_directory, int(time.time() * 1000))
+
+    def test_migrate_g2config_cache_01(self):
+
+        # Run test twice.
+
+        output_filenames = []
+        for run in range(2):
+            output_filename = "{0}-{1}.json".format(self.cache_directory, run)
+            output_filenames.append(output_filename)
+            args = get_parser().parse_args([
+                "migrate-g2config",
+                "--existing-g2config-file", "tests/test-01/data/original.json",
+                "--template-g2config-file", "tests/test-01/data/template.json",
+                "--cache-dir", self.cache_directory,
+                "--output-file", output_filename,
+            ])
+            with self.assertLogs(level="INFO") as logs:
+                do_migrate_g2config(args)
+            cache_hits = [line for line in logs.output if "cache-hit" in line]
+            self.assertEqual(len(cache_hits), run)
+
+        # Check results.
+
+        with open("tests/test-01/data/final.json") as final_file:
+            final_dictionary = json.load(final_file)
+        for output_filename in output_filenames:
+            with open(output_filename) as output_file:
+                self.assertDictEqual(json.load(output_file), final_dictionary, "Dictionaries are not equal")
+
+    def test_cache_put_01(self):
+
+        # Run test.
+
+        input_filename = "tests/test-01/data/final.json"
+        max_bytes = os.path.getsize(input_filename) * 2
+        for key in ["a", "b", "c"]:
+            cache_put(self.cache_directory, key, input_filename, max_bytes)
+            os.utime("{0}/{1}.json".format(self.cache_directory, key), (time.time(), time.time() + ord(key)))
+
+        # Check results.
+
+        self.assertEqual(sorted(os.listdir(self.cache_directory)), ["b.json", "c.json"])
+
+# -----------------------------------------------------------------------------
+# Test_09 - test serve subcommand
+# -----------------------------------------------------------------------------
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    '''An HTTP connection over a Unix domain socket.'''
+
+    def __init__(self, unix_socket):
+        super().__init__("localhost")
+        self.unix_socket = unix_socket
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_socket)
+
+
+class Test_09(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create input and output directories.
+
+        self.test_input_directory = "tests/test-01"
+        self.test_output_directory = "test-results/test-09"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def setUp(self):
+
+        # Load dictionaries.
+
+        with open("{0}/data/template.json".format(self.test_input_directory)) as template_file:
+            self.template_dictionary = json.load(template_file)
+        with open("{0}/data/final.json".format(self.test_input_directory)) as final_file:
+            self.final_dictionary = json.load(final_file)
+        self.request = {
+            "original_file": "{0}/data/original.json".format(self.test_input_directory),
+            "update_file": "{0}/data/template.json".format(self.test_input_directory),
+        }
+
+    def test_serve_request_01(self):
+
+        # Run test twice with the same cache.
+
+        json_file_cache = {}
+        for run in range(2):
+            result_dictionary = serve_request("transform_add_list_unique_elements", self.request, json_file_cache)
+            self.assertDictEqual(result_dictionary, self.final_dictionary, "Dictionaries are not equal")
+
+        # Check that cached files were parsed once and not modified.
+
+        self.assertEqual(len(json_file_cache), 2)
+        self.assertDictEqual(json_file_cache[self.request["update_file"]][1], self.template_dictionary, "Template was modified")
+
+    def test_serve_unix_socket_01(self):
+
+        # Start server.
+
+        unix_socket = "{0}/serve-{1}.sock".format(self.test_output_directory, os.getpid())
+        server = make_server(None, None, unix_socket)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        # Run test.
+
+        try:
+            connection = UnixHTTPConnection(unix_socket)
+            connection.request("POST", "/transform_add_list_unique_elements", body=json.dumps(self.request))
+            response = connection.getresponse()
+            response_dictionary = json.loads(response.read())
+            connection.request("POST", "/no_such_operation", body="{}")
+            missing_response = connection.getresponse()
+            missing_response.read()
+            connection.request("POST", "/transform_add_list_unique_elements", body=json.dumps({"original_file": self.request["original_file"]}))
+            bad_response = connection.getresponse()
+            bad_response.read()
+            connection.request("POST", "/transform_add_list_unique_elements", body=json.dumps({"original": [1, 2], "update": {"G2_CONFIG": {}}}))
+            failed_response = connection.getresponse()
+            failed_response_dictionary = json.loads(failed_response.read())
+            connection.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+            os.remove(unix_socket)
+
+        # Check results.
+
+        self.assertEqual(response.status, 200)
+        self.assertDictEqual(response_dictionary["result"], self.final_dictionary, "Dictionaries are not equal")
+        self.assertEqual(missing_response.status, 404)
+        self.assertEqual(bad_response.status, 400)
+        self.assertEqual(failed_response.status, 500)
+        self.assertIn("error", failed_response_dictionary)
+
+# -----------------------------------------------------------------------------
+# Test_10 - test start-up imports of migrate.py
+# -----------------------------------------------------------------------------
+
+
+class Test_10(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-10"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def test_importtime_01(self):
+
+        # Run test.
+
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import migrate"], capture_output=True, text=True, check=True)
+
+        # Output the import times.
+
+        output_filename = "{0}/test-importtime-01-{1}.txt".format(self.test_output_directory, int(time.time()))
+        with open(output_filename, "w") as output_file:
+            output_file.write(result.stderr)
+
+        # Check results.
+
+        imported_modules = set()
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                imported_modules.add(line.rsplit("|", 1)[1].strip())
+        self.assertIn("migrate", imported_modules)
+        for module in ["filecmp", "http.server", "shutil", "sqlite3", "socketserver", "mmap", "hashlib"]:
+            self.assertNotIn(module, imported_modules, "{0} imported at start-up".format(module))
+
+# -----------------------------------------------------------------------------
+# Test_11 - test json-difference over many files
+# -----------------------------------------------------------------------------
+
+
+class Test_11(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-11"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def test_json_difference_batch_01(self):
+
+        # Run test.
+
+        output_directory = "{0}/batch-{1}".format(self.test_output_directory, int(time.time() * 1000))
+        args = get_parser().parse_args([
+            "json-difference",
+            "--minuend", "tests/test-0*/data/final.json",
+            "--subtrahend", "tests/test-01/data/original.json",
+            "--output-dir", output_directory,
+            "--workers", "2",
+        ])
+        do_json_difference(args)
+
+        # Check results.
+
+        with open("tests/test-01/data/original.json") as subtrahend_file:
+            subtrahend_dictionary = json.load(subtrahend_file)
+        for test_number in range(1, 5):
+            relative_filename = "test-0{0}/data/final.json".format(test_number)
+            with open("tests/{0}".format(relative_filename)) as minuend_file:
+                expected_dictionary = dictionary_difference(json.load(minuend_file), subtrahend_dictionary)
+            with open("{0}/{1}".format(output_directory, relative_filename)) as output_file:
+                self.assertDictEqual(json.load(output_file), expected_dictionary, "Dictionaries are not equal")
+
+    def test_json_difference_batch_02(self):
+
+        # Run test with --output-file, which cannot hold many output files.
+
+        args = get_parser().parse_args([
+            "json-difference",
+            "--minuend", "tests/test-0*/data/final.json",
+            "--subtrahend", "tests/test-01/data/original.json",
+            "--output-file", "{0}/batch.json".format(self.test_output_directory),
+        ])
+        with self.assertRaises(SystemExit):
+            do_json_difference(args)
+
+    def test_json_difference_batch_03(self):
+
+        # Run test with --out-of-core, which needs a single minuend file.
+
+        args = get_parser().parse_args([
+            "json-difference",
+            "--minuend", "tests/test-0*/data/final.json",
+            "--subtrahend", "tests/test-01/data/original.json",
+            "--output-dir", "{0}/batch-out-of-core".format(self.test_output_directory),
+            "--out-of-core",
+        ])
+        with self.assertRaises(SystemExit):
+            do_json_difference(args)
+        self.assertFalse(os.path.exists("{0}/batch-out-of-core".format(self.test_output_directory)))
+
+# -----------------------------------------------------------------------------
+# Test_12 - test transform_three_way_merge()
+# -----------------------------------------------------------------------------
+
+
+class Test_12(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create input and output directories.
+
+        self.test_input_directory = "tests/test-12"
+        self.test_output_directory = "test-results/test-12"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def setUp(self):
+
+        # Load dictionaries.
+
+        with open("{0}/data/original.json".format(self.test_input_directory)) as original_file:
+            self.original_dictionary = json.load(original_file)
+        with open("{0}/data/base.json".format(self.test_input_directory)) as base_file:
+            self.base_dictionary = json.load(base_file)
+        with open("{0}/data/template.json".format(self.test_input_directory)) as template_file:
+            self.template_dictionary = json.load(template_file)
+        with open("{0}/data/final.json".format(self.test_input_directory)) as final_file:
+            self.final_dictionary = json.load(final_file)
+        with open("{0}/data/conflicts.json".format(self.test_input_directory)) as conflicts_file:
+            self.final_conflicts = json.load(conflicts_file)
+
+    def test_transform_three_way_merge_01(self):
+
+        # Run test.
+
+        conflicts = []
+        result_dictionary = transform_three_way_merge(self.original_dictionary, self.base_dictionary, self.template_dictionary, conflicts)
+
+        # Output result_dictionary.
+
+        output_filename = "{0}/test-transform-three-way-merge-01-{1}.json".format(self.test_output_directory, int(time.time()))
+        with open(output_filename, "w") as output_file:
+            json.dump(result_dictionary, output_file, sort_keys=True, indent=4)
+
+        # Check results.
+
+        self.assertDictEqual(result_dictionary, self.final_dictionary, "Dictionaries are not equal")
+        self.assertEqual(conflicts, self.final_conflicts, "Conflicts are not equal")
+
+    def test_migrate_g2config_conflicts_01(self):
+
+        # Run test with a compressed conflicts file.
+
+        output_filename = "{0}/test-migrate-g2config-conflicts-01-{1}.json".format(self.test_output_directory, int(time.time()))
+        args = get_parser().parse_args([
+            "migrate-g2config",
+            "--existing-g2config-file", "{0}/data/original.json".format(self.test_input_directory),
+            "--base-g2config-file", "{0}/data/base.json".format(self.test_input_directory),
+            "--template-g2config-file", "{0}/data/template.json".format(self.test_input_directory),
+            "--conflicts-file", "{0}.gz".format(output_filename),
+            "--output-file", output_filename,
+        ])
+        do_migrate_g2config(args)
+
+        # Check results.
+
+        with gzip.open("{0}.gz".format(output_filename), "rt") as conflicts_file:
+            self.assertEqual(json.load(conflicts_file), self.final_conflicts, "Conflicts are not equal")
+
+# -----------------------------------------------------------------------------
+# Test_13 - test make_migration_plan() and apply_migration_plan()
+# -----------------------------------------------------------------------------
+
+
+def make_senzing_directories(test_output_directory):
+    '''Create small old and new Senzing directories.  Returns (old, new, proposed).'''
+    root_directory = "{0}/senzing-{1}".format(test_output_directory, int(time.time() * 1000))
+    old_directory = "{0}/old".format(root_directory)
+    new_directory = "{0}/new".format(root_directory)
+    files = {
+        "{0}/g2/python/g2config.json".format(old_directory): open("tests/test-01/data/original.json").read(),
+        "{0}/g2/data/g2config.json".format(new_directory): open("tests/test-01/data/template.json").read(),
+        "{0}/g2/python/G2Module.ini".format(old_directory): "[SQL]\nCONNECTION=old\n",
+        "{0}/g2/python/G2Module.ini".format(new_directory): "[SQL]\nCONNECTION=new-and-longer\n",
+        "{0}/g2/python/same.py".format(old_directory): "same\n",
+        "{0}/g2/python/same.py".format(new_directory): "same\n",
+        "{0}/g2/python/demo/my-test.py".format(old_directory): "print('old only')\n",
+        "{0}/g2/python/G2Module.py".format(old_directory): "blacklisted\n",
+        "{0}/g2/data/g2.lic".format(old_directory): "old license\n",
+        "{0}/g2/data/g2.lic".format(new_directory): "new license, longer\n",
+    }
+    for filename, contents in files.items():
+        if not os.path.exists(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        with open(filename, "w") as output_file:
+            output_file.write(contents)
+
+    # Give identical files the same modification time.
+
+    stat = os.stat("{0}/g2/python/same.py".format(old_directory))
+    os.utime("{0}/g2/python/same.py".format(new_directory), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    return old_directory, new_directory, "{0}/proposed".format(root_directory)
+
+
+class Test_13(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-13"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def setUp(self):
+
+        # Create Senzing directories and populate the blacklist.
+
+        self.old_directory, self.new_directory, self.proposed_directory = make_senzing_directories(self.test_output_directory)
+        self.saved_blacklist = list(migrate.blacklist)
+        migrate.blacklist.append("{0}/g2/python/G2Module.py".format(self.old_directory))
+
+    def tearDown(self):
+
+        # Restore the blacklist.
+
+        migrate.blacklist[:] = self.saved_blacklist
+
+    def test_migration_plan_01(self):
+
+        # Run test.
+
+        plan = make_migration_plan(self.old_directory, self.new_directory, self.proposed_directory, None, throughput=1024)
+        plan = json.loads(json.dumps(plan))
+
+        # Check plan.
+
+        sources = sorted(os.path.relpath(entry["source"], self.old_directory) for entry in plan["copy"])
+        self.assertEqual(sources, ["g2/data/g2.lic", "g2/python/G2Module.ini", "g2/python/demo/my-test.py", "g2/python/g2config.json"])
+        self.assertEqual(plan["blacklisted"], ["{0}/g2/python/G2Module.py".format(self.old_directory)])
+        self.assertIn("{0}/g2/python/demo".format(self.proposed_directory), plan["directories"])
+        self.assertEqual(plan["total_bytes"], sum(entry["bytes"] for entry in plan["copy"]))
+        self.assertAlmostEqual(plan["estimated_seconds"], plan["total_bytes"] / 1024)
+        self.assertFalse(os.path.exists(self.proposed_directory))
+
+        # Apply plan and check results.
+
+        apply_migration_plan(plan)
+        for entry in plan["copy"]:
+            if entry["destination"].endswith("g2config.json"):
+                continue
+            with open(entry["source"], "rb") as source_file, open(entry["destination"], "rb") as destination_file:
+                self.assertEqual(source_file.read(), destination_file.read())
+        with open("{0}/g2/python/g2config.json".format(self.proposed_directory)) as g2config_file:
+            with open("tests/test-01/data/final.json") as final_file:
+                self.assertDictEqual(json.load(g2config_file), json.load(final_file), "Dictionaries are not equal")
+
+    def test_migration_plan_02(self):
+
+        # Make files of the same size: a changed license with the same modification time,
+        # and an unchanged file with a different modification time.
+
+        files = {
+            "{0}/g2/data/g2.lic".format(self.old_directory): "lic1",
+            "{0}/g2/data/g2.lic".format(self.new_directory): "lic2",
+            "{0}/g2/python/touched.py".format(self.old_directory): "touched\n",
+            "{0}/g2/python/touched.py".format(self.new_directory): "touched\n",
+        }
+        for filename, contents in files.items():
+            with open(filename, "w") as output_file:
+                output_file.write(contents)
+        os.utime("{0}/g2/data/g2.lic".format(self.old_directory), (1600000000, 1600000000))
+        os.utime("{0}/g2/data/g2.lic".format(self.new_directory), (1600000000, 1600000000))
+        os.utime("{0}/g2/python/touched.py".format(self.new_directory), (1600000000, 1600000000))
+
+        # Run test.
+
+        plan = make_migration_plan(self.old_directory, self.new_directory, self.proposed_directory, None, throughput=1024)
+        plan = json.loads(json.dumps(plan))
+        apply_migration_plan(plan)
+
+        # Check results.
+
+        verified = sorted(os.path.relpath(entry["source"], self.old_directory) for entry in plan["copy"] if "verify" in entry)
+        self.assertEqual(verified, ["g2/data/g2.lic", "g2/python/touched.py"])
+        proposal = read_directory_tree(self.proposed_directory)
+        self.assertEqual(proposal["g2/data/g2.lic"], b"lic1")
+        self.assertNotIn("g2/python/touched.py", proposal)
+
+# -----------------------------------------------------------------------------
+# Test_14 - test plan_diff_and_copy_directories_from_old() and copy_planned_files() with unusual paths
+# -----------------------------------------------------------------------------
+
+
+class Test_14(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-14"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def test_plan_diff_and_copy_directories_from_old_01(self):
+
+        # Create directories whose names contain regular expression metacharacters.
+
+        root_directory = "{0}/paths-{1}".format(self.test_output_directory, int(time.time() * 1000))
+        old_directory = "{0}/old (1.0)".format(root_directory)
+        new_directory = "{0}/new+[2.0]".format(root_directory)
+        proposed_directory = "{0}/proposed.*".format(root_directory)
+        files = {
+            "{0}/g2/python/sub.dir/changed.ini".format(old_directory): "old\n",
+            "{0}/g2/python/sub.dir/changed.ini".format(new_directory): "new\n",
+            "{0}/g2/python/old-only.py".format(old_directory): "old only\n",
+        }
+        for filename, contents in files.items():
+            if not os.path.exists(os.path.dirname(filename)):
+                os.makedirs(os.path.dirname(filename))
+            with open(filename, "w") as output_file:
+                output_file.write(contents)
+
+        # Run test.
+
+        directories_list = [["{0}/g2/python", "{1}/g2/python", "{2}/g2/python"]]
+        plan = new_migration_plan(old_directory, new_directory, proposed_directory, None)
+        plan_diff_and_copy_directories_from_old(directories_list, old_directory, new_directory, proposed_directory, plan, compare_contents=True)
+        copy_planned_files(plan)
+
+        # Check results.
+
+        for relative_filename in ["g2/python/sub.dir/changed.ini", "g2/python/old-only.py"]:
+            with open("{0}/{1}".format(proposed_directory, relative_filename)) as proposed_file:
+                with open("{0}/{1}".format(old_directory, relative_filename)) as old_file:
+                    self.assertEqual(proposed_file.read(), old_file.read())
+
+# -----------------------------------------------------------------------------
+# Test_15 - test scan_directory_diff()
+# -----------------------------------------------------------------------------
+
+
+class Test_15(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-15"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def assertSameDiff(self, directory_diff, dircmp):
+        self.assertEqual(directory_diff.left_only, sorted(dircmp.left_only))
+        self.assertEqual(directory_diff.right_only, sorted(dircmp.right_only))
+        self.assertEqual(directory_diff.diff_files, sorted(dircmp.diff_files))
+        self.assertEqual(sorted(directory_diff.subdirs), sorted(dircmp.subdirs))
+        for name, sub_directory_diff in directory_diff.subdirs.items():
+            self.assertSameDiff(sub_directory_diff, dircmp.subdirs[name])
+
+    def test_scan_directory_diff_01(self):
+
+        # Run test.
+
+        old_directory, new_directory, _ = make_senzing_directories(self.test_output_directory)
+        directory_diff = scan_directory_diff(old_directory, new_directory)
+
+        # Check results against filecmp.dircmp().
+
+        self.assertSameDiff(directory_diff, filecmp.dircmp(old_directory, new_directory))
+        self.assertIn("g2config.json", directory_diff.subdirs["g2"].subdirs["python"].left_entries)
+
+# -----------------------------------------------------------------------------
+# Test_16 - test migrate-senzing-dir --engine async
+# -----------------------------------------------------------------------------
+
+
+def read_directory_tree(directory):
+    '''Return a dictionary of relative filename to file contents.'''
+    result = {}
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            pathname = os.path.join(root, filename)
+            with open(pathname, "rb") as input_file:
+                result[os.path.relpath(pathname, directory)] = input_file.read()
+    return result
+
+
+class Test_16(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-16"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def test_migrate_senzing_dir_async_01(self):
+
+        # Run test with each engine.
+
+        old_directory, new_directory, proposed_directory = make_senzing_directories(self.test_output_directory)
+        for filename in ["{0}/g2/data/g2BuildVersion.txt".format(old_directory), "{0}/g2/data/g2BuildVersion.txt".format(new_directory)]:
+            with open(filename, "w") as output_file:
+                output_file.write("1.0.0\n")
+        proposals = {}
+        for engine in ["serial", "async"]:
+            args = get_parser().parse_args([
+                "migrate-senzing-dir",
+                "--old-senzing-dir", old_directory,
+                "--new-senzing-dir", new_directory,
+                "--proposed-senzing-dir", "{0}-{1}".format(proposed_directory, engine),
+                "--engine", engine,
+                "--concurrency", "2",
+            ])
+            do_migrate_senzing_dir(args)
+            proposals[engine] = read_directory_tree("{0}-{1}".format(proposed_directory, engine))
+
+        # Check results.
+
+        self.assertIn("g2/python/demo/my-test.py", proposals["serial"])
+        self.assertEqual(proposals["serial"], proposals["async"])
+
+    def test_migrate_senzing_dir_async_03(self):
+
+        # Make changed files that metadata alone does not reveal:
+        # a license of the same size and modification time, and an
+        # immutable database of the same size but a different modification time.
+
+        old_directory, new_directory, proposed_directory = make_senzing_directories(self.test_output_directory)
+        files = {
+            "{0}/g2/data/g2BuildVersion.txt".format(old_directory): "1.0.0\n",
+            "{0}/g2/data/g2BuildVersion.txt".format(new_directory): "1.0.0\n",
+            "{0}/g2/data/g2.lic".format(old_directory): "lic1",
+            "{0}/g2/data/g2.lic".format(new_directory): "lic2",
+            "{0}/g2/sqldb/G2C.db".format(old_directory): "AAAA",
+            "{0}/g2/data/G2C.db".format(old_directory): "BBBB",
+        }
+        for filename, contents in files.items():
+            if not os.path.exists(os.path.dirname(filename)):
+                os.makedirs(os.path.dirname(filename))
+            with open(filename, "w") as output_file:
+                output_file.write(contents)
+        os.utime("{0}/g2/data/g2.lic".format(old_directory), (1600000000, 1600000000))
+        os.utime("{0}/g2/data/g2.lic".format(new_directory), (1600000000, 1600000000))
+        os.utime("{0}/g2/sqldb/G2C.db".format(old_directory), (1577836800, 1577836800))
+        os.utime("{0}/g2/data/G2C.db".format(old_directory), (1609459200, 1609459200))
+
+        # Run test with each engine.
+
+        proposals = {}
+        for engine in ["serial", "async"]:
+            args = get_parser().parse_args([
+                "migrate-senzing-dir",
+                "--old-senzing-dir", old_directory,
+                "--new-senzing-dir", new_directory,
+                "--proposed-senzing-dir", "{0}-{1}".format(proposed_directory, engine),
+                "--immutable-file", "g2/sqldb/G2C.db",
+                "--engine", engine,
+            ])
+            do_migrate_senzing_dir(args)
+            proposals[engine] = read_directory_tree("{0}-{1}".format(proposed_directory, engine))
+
+        # Check results.
+
+        self.assertEqual(proposals["serial"].get("g2/data/g2.lic"), b"lic1")
+        self.assertEqual(proposals["serial"].get("g2/sqldb/G2C.db"), b"AAAA")
+        self.assertEqual(sorted(proposals["serial"]), sorted(proposals["async"]))
+
+    def test_migrate_senzing_dir_async_02(self):
+
+        # Make more old-only files than the copy queue holds.
+
+        old_directory, new_directory, proposed_directory = make_senzing_directories(self.test_output_directory)
+        os.makedirs("{0}/g2/python/many".format(old_directory))
+        for file_number in range(10):
+            with open("{0}/g2/python/many/file-{1}.py".format(old_directory, file_number), "w") as output_file:
+                output_file.write("# {0}\n".format(file_number))
+
+        # Run test with a copy that fails unexpectedly.
+
+        def failing_copy_file(old_file, new_file, exists=False):
+            raise RuntimeError("copy failed")
+
+        directories_list = [["{0}/g2/python", "{1}/g2/python", "{2}/g2/python"]]
+        walk = async_propose_diff_and_copy_directories_from_old(directories_list, old_directory, new_directory, proposed_directory, 1)
+        with unittest.mock.patch("migrate.copy_file", failing_copy_file):
+            with self.assertRaises(RuntimeError):
+                asyncio.run(asyncio.wait_for(walk, timeout=60))
+
+# -----------------------------------------------------------------------------
+# Test_17 - test migrate-senzing-dir --progress json
+# -----------------------------------------------------------------------------
+
+
+class Test_17(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-17"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def test_migrate_senzing_dir_progress_01(self):
+
+        # Run test as a subprocess to capture standard output.
+
+        old_directory, new_directory, proposed_directory = make_senzing_directories(self.test_output_directory)
+        for filename in ["{0}/g2/data/g2BuildVersion.txt".format(old_directory), "{0}/g2/data/g2BuildVersion.txt".format(new_directory)]:
+            with open(filename, "w") as output_file:
+                output_file.write("1.0.0\n")
+        completed_process = subprocess.run([
+            sys.executable, "migrate.py", "migrate-senzing-dir",
+            "--old-senzing-dir", old_directory,
+            "--new-senzing-dir", new_directory,
+            "--proposed-senzing-dir", proposed_directory,
+            "--progress", "json",
+            "--progress-interval", "0",
+        ], stdout=subprocess.PIPE, check=True)
+
+        # Check results.
+
+        reports = [json.loads(line) for line in completed_process.stdout.decode().splitlines()]
+        self.assertTrue(reports)
+        final_report = reports[-1]
+        self.assertGreater(final_report["files_compared"], 0)
+        self.assertGreater(final_report["files_copied"], 0)
+        self.assertEqual(final_report["files_copied"], final_report["files_total"])
+        self.assertEqual(final_report["bytes_copied"], final_report["bytes_total"])
+        self.assertGreater(final_report["rows_done"], 0)
+        self.assertEqual(final_report["eta_seconds"], 0.0)
+
+    def test_progress_status_01(self):
+
+        # Check estimated time remaining from known totals.
+
+        progress.start()
+        progress.add_totals(files=4, byte_count=400)
+        progress.copied(byte_count=100)
+        status = progress.status()
+        self.assertEqual(status["files_copied"], 1)
+        self.assertEqual(status["bytes_copied"], 100)
+        self.assertIsNotNone(status["eta_seconds"])
+        progress.start()
+
+# -----------------------------------------------------------------------------
+# Test_18 - test proposal manifest and verify-proposal
+# -----------------------------------------------------------------------------
+
+
+class Test_18(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-18"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def test_verify_proposal_01(self):
+
+        # Run migrate-senzing-dir.
+
+        old_directory, new_directory, proposed_directory = make_senzing_directories(self.test_output_directory)
+        for filename in ["{0}/g2/data/g2BuildVersion.txt".format(old_directory), "{0}/g2/data/g2BuildVersion.txt".format(new_directory)]:
+            with open(filename, "w") as output_file:
+                output_file.write("1.0.0\n")
+        args = get_parser().parse_args([
+            "migrate-senzing-dir",
+            "--old-senzing-dir", old_directory,
+            "--new-senzing-dir", new_directory,
+            "--proposed-senzing-dir", proposed_directory,
+        ])
+        do_migrate_senzing_dir(args)
+
+        # Check manifest.
+
+        with open("{0}-manifest.json".format(proposed_directory)) as manifest_file:
+            manifest = json.load(manifest_file)
+        self.assertEqual(sorted(manifest["files"].keys()), sorted(read_directory_tree(proposed_directory).keys()))
+        for relative_filename, expected in manifest["files"].items():
+            self.assertEqual(expected["sha256"], file_digest(os.path.join(proposed_directory, relative_filename)))
+        self.assertEqual(verify_proposal(proposed_directory, manifest, 2), {"missing": [], "changed": [], "unexpected": []})
+
+        # Change, remove, and add files.
+
+        with open("{0}/g2/python/G2Module.ini".format(proposed_directory), "a") as output_file:
+            output_file.write("changed\n")
+        os.remove("{0}/g2/python/demo/my-test.py".format(proposed_directory))
+        with open("{0}/g2/python/added.py".format(proposed_directory), "w") as output_file:
+            output_file.write("added\n")
+
+        # Check results.
+
+        result = verify_proposal(proposed_directory, manifest, 2)
+        self.assertEqual(result["changed"], ["g2/python/G2Module.ini"])
+        self.assertEqual(result["missing"], ["g2/python/demo/my-test.py"])
+        self.assertEqual(result["unexpected"], ["g2/python/added.py"])
+
+# -----------------------------------------------------------------------------
+# Test_19 - test json-difference --out-of-core
+# -----------------------------------------------------------------------------
+
+
+def strip_empty_containers(dictionary):
+    '''Return a copy of a dictionary without empty objects and lists, which iter_json_stream() does not report.'''
+    result = {}
+    for key, value in dictionary.items():
+        if isinstance(value, dict):
+            value = strip_empty_containers(value)
+        if value != {} and value != []:
+            result[key] = value
+    return result
+
+
+class Test_19(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-19"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def test_out_of_core_dictionary_difference_01(self):
+
+        # Compare with dictionary_difference() for each pair of test files.
+
+        filenames = ["tests/test-0{0}/data/{1}.json".format(test, name) for test in range(1, 5) for name in ["original", "template"]]
+        for minuend_filename in filenames:
+            for subtrahend_filename in filenames:
+                with open(minuend_filename) as minuend_file, open(subtrahend_filename) as subtrahend_file:
+                    expected_dictionary = dictionary_difference(json.load(minuend_file), json.load(subtrahend_file))
+                actual_dictionary = out_of_core_dictionary_difference(minuend_filename, subtrahend_filename, self.test_output_directory)
+                self.assertEqual(actual_dictionary, expected_dictionary, "{0} - {1}".format(minuend_filename, subtrahend_filename))
+
+    def test_iter_json_stream_01(self):
+
+        # Read with blocks smaller than the values.
+
+        input_filename = "tests/test-01/data/template.json"
+        with open(input_filename) as input_file:
+            expected_dictionary = json.load(input_file)
+        actual_dictionary = {}
+        with open(input_filename) as input_file:
+            for event, path, value in iter_json_stream(JsonStreamReader(input_file, block_size=3)):
+                node = actual_dictionary
+                for key in path[:-1]:
+                    node = node.setdefault(key, {})
+                if event == "element":
+                    node.setdefault(path[-1], []).append(value)
+                elif event == "scalar":
+                    node[path[-1]] = value
+        self.assertEqual(actual_dictionary, strip_empty_containers(expected_dictionary))
+
+    def test_iter_json_stream_02(self):
+
+        # Read numbers split across blocks.
+
+        input_json = '{"a": [1.25, 2.5e10, 3], "b": 12.75, "c": {"d": -0.5E-3, "e": [true, null, 10]}}'
+        expected_events = [
+            ("element", ("a",), 1.25),
+            ("element", ("a",), 2.5e10),
+            ("element", ("a",), 3),
+            ("scalar", ("b",), 12.75),
+            ("scalar", ("c", "d"), -0.5E-3),
+            ("element", ("c", "e"), True),
+            ("element", ("c", "e"), None),
+            ("element", ("c", "e"), 10),
+        ]
+        for block_size in range(1, len(input_json) + 1):
+            actual_events = [(event, path, value) for event, path, value in iter_json_stream(JsonStreamReader(io.StringIO(input_json), block_size=block_size)) if event != "map"]
+            self.assertEqual(actual_events, expected_events, "block size {0}".format(block_size))
+
+# -----------------------------------------------------------------------------
+# Test_20 - test compressed input and output files
+# -----------------------------------------------------------------------------
+
+
+class Test_20(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_input_directory = "tests/test-03"
+        self.test_output_directory = "test-results/test-20"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def test_json_add_keys_compressed_01(self):
+
+        # Compress the inputs.  The template's name does not say it is compressed.
+
+        existing_filename = "{0}/original.json.xz".format(self.test_output_directory)
+        template_filename = "{0}/template.json".format(self.test_output_directory)
+        with open("{0}/data/original.json".format(self.test_input_directory)) as input_file, open_compressed(existing_filename, "w") as output_file:
+            output_file.write(input_file.read())
+        with open("{0}/data/template.json".format(self.test_input_directory), "rb") as input_file, gzip.open(template_filename, "wb") as output_file:
+            output_file.write(input_file.read())
+        self.assertEqual(compression_of(existing_filename), "xz")
+        self.assertEqual(compression_of(template_filename), "gzip")
+
+        # Run test.
+
+        output_filename = "{0}/test-json-add-keys-{1}.json.gz".format(self.test_output_directory, int(time.time()))
+        subprocess.run([
+            sys.executable, "migrate.py", "json-add-keys",
+            "--existing-file", existing_filename,
+            "--template-file", template_filename,
+            "--output-file", output_filename,
+        ], stderr=subprocess.DEVNULL, check=True)
+
+        # Check results.
+
+        self.assertEqual(compression_of(output_filename), "gzip")
+        with open_compressed(output_filename) as output_file:
+            result_dictionary = json.load(output_file)
+        with open("{0}/data/final.json".format(self.test_input_directory)) as final_file:
+            self.assertDictEqual(result_dictionary, json.load(final_file))
+
+# -----------------------------------------------------------------------------
+# Test_21 - test migrate-senzing-dir --proposal-format tar and apply-proposal
+# -----------------------------------------------------------------------------
+
+
+class Test_21(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create output directory.
+
+        self.test_output_directory = "test-results/test-21"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def test_apply_proposal_01(self):
+
+        # Run test with each proposal format.
+
+        old_directory, new_directory, proposed_directory = make_senzing_directories(self.test_output_directory)
+        for filename in ["{0}/g2/data/g2BuildVersion.txt".format(old_directory), "{0}/g2/data/g2BuildVersion.txt".format(new_directory)]:
+            with open(filename, "w") as output_file:
+                output_file.write("1.0.0\n")
+        for proposal_format in ["dir", "tar"]:
+            args = get_parser().parse_args([
+                "migrate-senzing-dir",
+                "--old-senzing-dir", old_directory,
+                "--new-senzing-dir", new_directory,
+                "--proposed-senzing-dir", "{0}-{1}".format(proposed_directory, proposal_format),
+                "--proposal-format", proposal_format,
+            ])
+            do_migrate_senzing_dir(args)
+
+        # Apply the archive.
+
+        applied_directory = "{0}-applied".format(proposed_directory)
+        os.makedirs(applied_directory)
+        result = apply_proposal_archive("{0}-tar.tar".format(proposed_directory), applied_directory)
+
+        # Check results.
+
+        self.assertFalse(os.path.exists("{0}-tar".format(proposed_directory)))
+        with tarfile.open("{0}-tar.tar".format(proposed_directory)) as tar:
+            member_names = tar.getnames()
+        self.assertEqual(len(member_names), len(set(member_names)))
+        self.assertEqual(result, {"missing": [], "changed": []})
+        self.assertEqual(read_directory_tree(applied_directory), read_directory_tree("{0}-dir".format(proposed_directory)))
+
+        # Change one file of the archive.  Nothing is applied.
+
+        corrupt_filename = "{0}-corrupt.tar".format(proposed_directory)
+        with tarfile.open("{0}-tar.tar".format(proposed_directory)) as input_tar, tarfile.open(corrupt_filename, "w") as output_tar:
+            for member in input_tar:
+                content = input_tar.extractfile(member).read()
+                if member.name.endswith("my-test.py"):
+                    content = content + b"# corrupt\n"
+                    member.size = len(content)
+                output_tar.addfile(member, io.BytesIO(content))
+        corrupt_directory = "{0}-corrupt".format(proposed_directory)
+        os.makedirs(corrupt_directory)
+        result = apply_proposal_archive(corrupt_filename, corrupt_directory)
+        self.assertEqual(len(result["changed"]), 1)
+        self.assertEqual(os.listdir(corrupt_directory), [])
+        self.assertFalse([name for name in os.listdir(os.path.dirname(corrupt_directory)) if name.startswith(".senzing-proposal-")])
+
+    def test_proposal_archive_duplicate_01(self):
+
+        # Run test.
+
+        archive = ProposalArchive()
+        archive_filename = "{0}/duplicate-{1}.tar".format(self.test_output_directory, int(time.time() * 1000))
+        archive.open("proposed", archive_filename, "tar")
+        archive.add_bytes(b"first", "proposed/g2/python/g2config.json")
+
+        # Check results.
+
+        with self.assertRaises(ValueError):
+            archive.add_bytes(b"second", "proposed/g2/python/g2config.json")
+        archive.close()
+
+# -----------------------------------------------------------------------------
+# Test_22 - test validate-g2config
+# -----------------------------------------------------------------------------
+
+
+class Test_22(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        # Create input and output directories.
+
+        self.test_input_directory = "tests/test-22"
+        self.test_output_directory = "test-results/test-22"
+        if not os.path.exists(self.test_output_directory):
+            os.makedirs(self.test_output_directory)
+
+    def setUp(self):
+
+        # Load dictionaries.
+
+        with open("{0}/data/g2config.json".format(self.test_input_directory)) as g2config_file:
+            self.g2config_dictionary = json.load(g2config_file)
+        with open("{0}/data/dangling.json".format(self.test_input_directory)) as dangling_file:
+            self.dangling_references = json.load(dangling_file)
+
+    def test_g2config_dangling_references_01(self):
+
+        # Run test.
+
+        result = g2config_dangling_references(self.g2config_dictionary)
+
+        # Check results.
+
+        self.assertEqual(result, self.dangling_references)
+
+    def test_validate_g2config_01(self):
+
+        # Run test.
+
+        output_filename = "{0}/test-validate-g2config-01-{1}.json".format(self.test_output_directory, int(time.time()))
+        completed_process = subprocess.run([
+            sys.executable, "migrate.py", "validate-g2config",
+            "--input-file", "{0}/data/g2config.json".format(self.test_input_directory),
+            "--output-file", output_filename,
+        ], stderr=subprocess.DEVNULL)
+
+        # Check results.
+
+        self.assertEqual(completed_process.returncode, 1)
+        with open(output_filename) as output_file:
+            self.assertEqual(json.load(output_file), self.dangling_references)
+
 # -----------------------------------------------------------------------------
 # Main
 # -----------------------------------------------------------------------------